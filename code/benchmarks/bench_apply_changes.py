@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# Drive WorldManager.apply_changes against the in-memory FakeTransport and check batching,
+# update/remove handling (including removals Gazebo applies a step later) and per-model results (including models
+# missing from the scene or arriving late), timing each apply
+# Run from the code/ directory: python3 benchmarks/bench_apply_changes.py [num_models] [latency_ms]
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.gazebo_transport import FakeTransport
+from classes.world_manager import WorldManager
+
+
+class RunningProcess:
+    # Stand-in for the Gazebo process handle: always running
+    def poll(self):
+        return None
+
+
+def make_obstacle(i):
+    # A static box at a distinct spot
+    return {"name": f"box_{i}", "type": "box", "status": "new",
+            "properties": {"position": (i % 100, i // 100, 0.5), "size": (0.5, 0.5, 1.0), "color": "Gray"}}
+
+
+def timed_apply(world_manager):
+    # Run apply_changes and return its results, the seconds it took and the service calls it made
+    calls = world_manager.transport.calls
+    start = time.perf_counter()
+    results = world_manager.apply_changes()
+    return results, time.perf_counter() - start, world_manager.transport.calls - calls
+
+
+def main():
+    num_models = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.005
+    with tempfile.TemporaryDirectory() as output_dir:
+        transport = FakeTransport(latency=latency)
+        world_manager = WorldManager("gazebo", "harmonic", transport=transport)
+        world_manager.worlds_dir = output_dir
+        world_manager.create_new_world("bench_apply", launch=False)
+        world_manager.process = RunningProcess()
+        batch_size = world_manager.batch_size
+
+        # Create: one create request per batch, every model reported and written once
+        for i in range(num_models):
+            world_manager.add_model(make_obstacle(i))
+        results, elapsed, calls = timed_apply(world_manager)
+        assert len(results) == num_models and all(results.values()), "create failed"
+        assert calls == math.ceil(num_models / batch_size), f"expected batched creates, got {calls} calls"
+        assert len(transport.entities) == num_models
+        assert all(model["status"] == "" for model in world_manager.models)
+        with open(world_manager.world_path, encoding="utf-8") as f:
+            assert f.read().count("<model name='box_") == num_models, "SDF does not hold every model once"
+        print(f"create {num_models:6d}:  {elapsed * 1e3:8.1f} ms  {calls} requests")
+
+        # Update a quarter and remove a quarter: one remove pass for both, then one create pass for the updates
+        quarter = num_models // 4
+        for i in range(quarter):
+            model = world_manager.models.get(f"box_{i}").to_dict()
+            model["properties"]["color"] = "Red"
+            model["status"] = "updated"
+            world_manager.add_model(model)
+        for i in range(quarter, 2 * quarter):
+            world_manager.remove_model(f"box_{i}")
+        results, elapsed, calls = timed_apply(world_manager)
+        assert len(results) == 2 * quarter and all(results.values()), "update/remove failed"
+        assert calls == math.ceil(2 * quarter / batch_size) + math.ceil(quarter / batch_size)
+        assert len(transport.entities) == num_models - quarter
+        assert len(world_manager.models) == num_models - quarter
+        assert "<diffuse>1 0 0 1</diffuse>" in transport.entities["box_0"], "update was not respawned"
+        with open(world_manager.world_path, encoding="utf-8") as f:
+            assert f.read().count("<model name='box_") == num_models - quarter
+        print(f"update {quarter:6d} + remove {quarter:6d}:  {elapsed * 1e3:8.1f} ms  {calls} requests")
+
+        # Per-model results: a create the simulator refuses fails, the rest of its batch still applies
+        create_entities = transport.create_entities
+
+        def refuse_some(world_name, snippets):
+            # Fail box_refused without sending it, pass the rest of the batch on
+            accepted = iter(create_entities(world_name, [sdf for sdf in snippets if "box_refused" not in sdf]))
+            return [False if "box_refused" in sdf else next(accepted) for sdf in snippets]
+        transport.create_entities = refuse_some
+        world_manager.add_model(dict(make_obstacle(num_models), name="box_refused"))
+        world_manager.add_model(make_obstacle(num_models + 1))
+        results, elapsed, calls = timed_apply(world_manager)
+        transport.create_entities = create_entities
+        assert results == {"box_refused": False, f"box_{num_models + 1}": True}, results
+        assert world_manager.models.get("box_refused")["status"] == "new", "failed model must stay pending"
+        print(f"partial failure:  {elapsed * 1e3:8.1f} ms  {calls} requests  {results}")
+
+        # A pending model that reached the scene after an earlier apply gave up on it is not created again
+        transport.entities["box_refused"] = "<sdf/>"
+        results, elapsed, calls = timed_apply(world_manager)
+        assert results == {"box_refused": True} and calls == 0, (results, calls)
+        assert world_manager.models.get("box_refused")["status"] == ""
+        print(f"late arrival:  {elapsed * 1e3:8.1f} ms  {calls} requests  {results}")
+
+        # Like gz-sim, drop removed entities only a few scene polls later: an updated model is respawned
+        # once its old entity is gone instead of being refused under a name the scene still has
+        remove_entities = transport.remove_entities
+        list_models = transport.list_models
+        lingering = {}
+
+        def remove_later(world_name, names):
+            # Accept the removal of known models but leave them in the scene for now
+            transport._call()
+            lingering.update((name, 3) for name in names if name in transport.entities)
+            return [name in transport.entities for name in names]
+
+        def list_lingering(world_name):
+            # Each poll is one more step; removals take effect once their countdown runs out
+            for name in list(lingering):
+                lingering[name] -= 1
+                if not lingering[name]:
+                    del lingering[name]
+                    transport.entities.pop(name)
+            return list_models(world_name)
+        transport.remove_entities = remove_later
+        transport.list_models = list_lingering
+        model = world_manager.models.get(f"box_{num_models + 1}").to_dict()
+        model["properties"]["color"] = "Blue"
+        model["status"] = "updated"
+        world_manager.add_model(model)
+        results, elapsed, calls = timed_apply(world_manager)
+        transport.remove_entities = remove_entities
+        transport.list_models = list_models
+        assert results == {f"box_{num_models + 1}": True}, results
+        assert "<diffuse>0 0 1 1</diffuse>" in transport.entities[f"box_{num_models + 1}"], "update was not respawned"
+        print(f"deferred removal:  {elapsed * 1e3:8.1f} ms  {calls} requests  {results}")
+
+        # A model that is created but never shows up in the scene is reported as failed and not saved
+        transport.list_models = lambda world_name: list_models(world_name) - {"box_ghost"}
+        world_manager.ready_timeout = 0.2
+        world_manager.add_model(dict(make_obstacle(num_models + 2), name="box_ghost"))
+        results, elapsed, calls = timed_apply(world_manager)
+        assert results == {"box_ghost": False}, results
+        with open(world_manager.world_path, encoding="utf-8") as f:
+            assert "box_ghost" not in f.read(), "a missing model must not be saved"
+        print(f"missing in scene:  {elapsed * 1e3:8.1f} ms  {calls} requests  {results}")
+
+
+if __name__ == "__main__":
+    main()
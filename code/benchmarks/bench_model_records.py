@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# Compare memory use and walk time of model dicts and typed records on a synthetic world
+# Run from the code/ directory: python3 benchmarks/bench_model_records.py [num_models]
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.model_records import record_from_dict
+from classes.model_store import ModelStore
+
+COLORS = ["Black", "Gray", "White", "Red", "Blue", "Green"]
+
+
+def make_world(num_models, seed=0):
+    # Generate a mix of walls, static obstacles and dynamic obstacles as model dicts
+    rng = random.Random(seed)
+    models = []
+    for i in range(num_models):
+        x, y = rng.uniform(-50, 50), rng.uniform(-50, 50)
+        kind = i % 4
+        if kind == 0:
+            models.append({"name": f"wall_{i}", "type": "wall", "properties": {
+                "start": (x, y), "end": (x + rng.uniform(-5, 5), y + rng.uniform(-5, 5)),
+                "width": 0.1, "height": 1.0, "color": rng.choice(COLORS)}, "status": ""})
+            continue
+        if kind == 1:
+            model_type, size = "box", (rng.uniform(0.1, 2), rng.uniform(0.1, 2), 1.0)
+        elif kind == 2:
+            model_type, size = "cylinder", (rng.uniform(0.1, 1), 1.0)
+        else:
+            model_type, size = "sphere", (rng.uniform(0.1, 1),)
+        props = {"position": (x, y, 0.5), "size": size, "color": rng.choice(COLORS)}
+        if i % 8 == 3:
+            props["motion"] = {"type": "polygon", "velocity": 1.0, "std": 0.1,
+                               "path": [(x, y), (x + 1, y), (x + 1, y + 1)]}
+        models.append({"name": f"{model_type}_{i}", "type": model_type, "properties": props, "status": ""})
+    return models
+
+
+def measure(build):
+    # Return the result of build() and the memory it retains in bytes
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def walk_dicts(models):
+    # Sum wall lengths and obstacle x positions the way the pages read dicts
+    total = 0.0
+    for model in models:
+        props = model["properties"]
+        if model["type"] == "wall":
+            total += abs(props["end"][0] - props["start"][0])
+        else:
+            total += props["position"][0]
+    return total
+
+
+def walk_records(records):
+    # Same walk over typed records through their dict interface, as code written for dicts reads them
+    total = 0.0
+    for record in records:
+        props = record["properties"]
+        if record["type"] == "wall":
+            total += abs(props["end"][0] - props["start"][0])
+        else:
+            total += props["position"][0]
+    return total
+
+
+def walk_fields(records):
+    # Same walk over the typed fields, as the canvas, spatial index, validator and SDF generation read them
+    total = 0.0
+    for record in records:
+        if record.model_type == "wall":
+            total += abs(record.end_x - record.start_x)
+        else:
+            total += record.x
+    return total
+
+
+def main():
+    num_models = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    models, dict_bytes = measure(lambda: make_world(num_models))
+    records, record_bytes = measure(lambda: [record_from_dict(m) for m in make_world(num_models)])
+    # What WorldManager actually holds: the store with its name, type and status indexes
+    store, store_bytes = measure(lambda: ModelStore(make_world(num_models)))
+
+    walks = []
+    for walk, world in ((walk_dicts, models), (walk_records, records), (walk_fields, records)):
+        start = time.perf_counter()
+        total = walk(world)
+        walks.append((time.perf_counter() - start, total))
+    (dict_walk, dict_total), (record_walk, record_total), (field_walk, field_total) = walks
+    assert dict_total == record_total == field_total, "walks disagree"
+
+    assert all(record.to_dict() == model for record, model in zip(records, models)), "conversion is not lossless"
+    print(f"models:         {num_models}")
+    print(f"dict layout:    {dict_bytes / 1e6:8.1f} MB  walk {dict_walk * 1e3:7.1f} ms")
+    print(f"record layout:  {record_bytes / 1e6:8.1f} MB  walk {record_walk * 1e3:7.1f} ms  "
+          f"(typed fields {field_walk * 1e3:.1f} ms)")
+    print(f"memory ratio:   {dict_bytes / record_bytes:8.2f}x")
+    print(f"ModelStore:     {store_bytes / 1e6:8.1f} MB  (records plus indexes)")
+
+
+if __name__ == "__main__":
+    main()
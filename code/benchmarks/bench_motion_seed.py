@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Step MotionEngine with noisy velocities and check that a seed makes the trajectories repeatable:
+# the same seed gives the same poses, independent of obstacle order and sharding, and another seed does not
+# Run from the code/ directory: python3 benchmarks/bench_motion_seed.py [num_obstacles] [ticks]
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.motion_runtime import MotionEngine, precompute_trajectory, shard_of
+from classes.motion_scenario import SCENARIO_VERSION, write_scenario
+
+
+def make_obstacles(num_obstacles, seed=0):
+    # Scenario obstacles cycling through the linear, elliptical and polygon motions, all with velocity noise
+    rng = random.Random(seed)
+    obstacles = []
+    for i in range(num_obstacles):
+        x, y = rng.uniform(-50, 50), rng.uniform(-50, 50)
+        kind = i % 3
+        if kind == 0:
+            motion = {"type": "linear", "path": [[x, y], [x + rng.uniform(1, 5), y + rng.uniform(-5, 5)]]}
+        elif kind == 1:
+            motion = {"type": "elliptical", "semi_major": rng.uniform(1, 3), "semi_minor": rng.uniform(0.3, 1),
+                      "angle": rng.uniform(0, 3)}
+        else:
+            motion = {"type": "polygon", "path": [[x, y], [x + 2, y], [x + 2, y + 2], [x, y + 2]]}
+        motion.update(velocity=rng.uniform(0.2, 2.0), std=rng.uniform(0.05, 0.5))
+        obstacles.append({"name": f"obstacle_{i}", "center": [x, y], "z": 0.5, "motion": motion})
+    return obstacles
+
+
+def run(obstacles, seed, ticks, dt=0.005):
+    # Step an engine and return {name: (ticks, 3) array of poses}
+    engine = MotionEngine(obstacles, seed)
+    steps = []
+    for _ in range(ticks):
+        names, poses = engine.step(dt)
+        steps.append(poses)
+    poses = np.array(steps, dtype=float).reshape(ticks, len(names), 3)
+    return {name: poses[:, i] for i, name in enumerate(names)}
+
+
+def same(a, b):
+    # Whether two runs give bitwise identical poses for the same obstacles
+    return a.keys() == b.keys() and all(np.array_equal(a[name], b[name]) for name in a)
+
+
+def main():
+    num_obstacles = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    obstacles = make_obstacles(num_obstacles)
+
+    # Same seed: identical trajectories
+    start = time.perf_counter()
+    first = run(obstacles, 42, ticks)
+    elapsed = time.perf_counter() - start
+    assert same(first, run(obstacles, 42, ticks)), "same seed gave different trajectories"
+    print(f"seeded run {num_obstacles:5d} x {ticks:5d} ticks:  {elapsed * 1e3:8.1f} ms, repeatable")
+
+    # The noise of an obstacle depends on (seed, name) only, not on the order or shard it runs in
+    shuffled = list(obstacles)
+    random.Random(1).shuffle(shuffled)
+    assert same(first, run(shuffled, 42, ticks)), "obstacle order changed the trajectories"
+    sharded = {}
+    for shard in range(3):
+        sharded.update(run([o for o in obstacles if shard_of(o["name"], 3) == shard], 42, ticks))
+    assert same(first, sharded), "sharding changed the trajectories"
+    print("order and sharding:  unchanged")
+
+    # Another seed, or no seed, moves the obstacles differently
+    assert not same(first, run(obstacles, 43, ticks)), "different seeds gave the same trajectories"
+    assert not same(first, run(obstacles, None, ticks)), "unseeded run matched the seeded one"
+    print("other seed / unseeded:  different")
+
+    # Precomputed trajectories of a seeded scenario are identical too
+    with tempfile.TemporaryDirectory() as output_dir:
+        scenario_path = os.path.join(output_dir, "bench_motion.json")
+        write_scenario(scenario_path, {"format": SCENARIO_VERSION, "version": "harmonic", "world": "bench_motion",
+                                       "rate": 200.0, "seed": 42, "obstacles": obstacles})
+        paths = [os.path.join(output_dir, f"trajectory_{i}.npy") for i in range(2)]
+        start = time.perf_counter()
+        for path in paths:
+            precompute_trajectory(scenario_path, path, ticks / 200.0)
+        elapsed = time.perf_counter() - start
+        assert np.array_equal(np.load(paths[0]), np.load(paths[1])), "precomputed trajectories differ"
+        print(f"precompute x2:  {elapsed * 1e3:8.1f} ms, identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Check that WorldManager.load_world gives the same world from the binary cache as from a full parse of the SDF,
+# that the cache is written 0644 and a stale or truncated one is ignored, and time both loads
+# Run from the code/ directory: python3 benchmarks/bench_world_cache.py [num_models]
+import os
+import random
+import sys
+import tempfile
+import time
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.world_cache import cache_path
+from classes.world_manager import WorldManager
+
+COLORS = ["Black", "Gray", "White", "Red", "Blue", "Green"]
+
+
+def make_model(world_manager, rng, i):
+    # A wall, or a box, cylinder or sphere that is static or moves along one of the motion types
+    x, y = rng.uniform(-50, 50), rng.uniform(-50, 50)
+    color = rng.choice(COLORS)
+    if i % 5 == 0:
+        return {"name": world_manager.next_model_name("wall"), "type": "wall", "status": "", "properties": {
+            "start": (x, y), "end": (x + rng.uniform(-5, 5), y + rng.uniform(-5, 5)),
+            "width": rng.uniform(0.05, 0.3), "height": 1.0, "color": color}}
+    model_type = ("box", "cylinder", "sphere")[i % 3]
+    size = {"box": (rng.uniform(0.1, 2), rng.uniform(0.1, 2), 1.0), "cylinder": (rng.uniform(0.1, 1), 1.0),
+            "sphere": (rng.uniform(0.1, 1),)}[model_type]
+    props = {"position": (x, y, 0.5), "size": size, "color": color}
+    kind = i % 4
+    if kind == 1:
+        props["motion"] = {"type": "linear", "velocity": 1.0, "std": 0.1, "path": [(x, y), (x + 2, y + 1)]}
+    elif kind == 2:
+        props["motion"] = {"type": "elliptical", "velocity": 0.5, "std": 0.0, "semi_major": 2.0,
+                           "semi_minor": 1.0, "angle": rng.uniform(0, 3)}
+    elif kind == 3:
+        props["motion"] = {"type": "polygon", "velocity": 0.8, "std": 0.2,
+                           "path": [(x, y), (x + 1, y), (x + 1, y + 1)]}
+    return {"name": world_manager.next_model_name(model_type), "type": model_type, "status": "",
+            "properties": props}
+
+
+def snapshot(world_manager):
+    # Everything load_world leaves behind that later edits and saves depend on
+    return ([model.to_dict() for model in world_manager.models], world_manager.motion_seed, world_manager.world_name,
+            sorted(world_manager.model_elements), ET.tostring(world_manager.sdf_root))
+
+
+def timed_load(world_manager, world_name):
+    # Load a world without launching Gazebo and return the seconds it took
+    start = time.perf_counter()
+    world_manager.load_world(world_name, launch=False)
+    return time.perf_counter() - start
+
+
+def main():
+    num_models = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Build and save a world next to the foreign models of the empty template (ground plane, ...)
+        world_manager = WorldManager("gazebo", "harmonic")
+        world_manager.worlds_dir = output_dir
+        world_manager.create_new_world("bench_cache", launch=False)
+        world_manager.motion_seed = 7
+        for i in range(num_models):
+            world_manager.add_model(make_model(world_manager, rng, i))
+        world_manager.save_world()
+        world_path = world_manager.world_path
+        assert not os.path.exists(cache_path(world_path))
+
+        # The first load parses the SDF and writes the cache, the second one reads the cache
+        parsed = WorldManager("gazebo", "harmonic")
+        parsed.worlds_dir = output_dir
+        parse_time = timed_load(parsed, "bench_cache")
+        assert os.path.exists(cache_path(world_path)), "no cache was written"
+        assert os.stat(cache_path(world_path)).st_mode & 0o777 == 0o644, "cache is not readable by others"
+        cached = WorldManager("gazebo", "harmonic")
+        cached.worlds_dir = output_dir
+        cache_time = timed_load(cached, "bench_cache")
+        assert snapshot(cached) == snapshot(parsed), "cached load differs from the full parse"
+        assert len(parsed.models) > num_models, "the template's models are missing"
+        assert parsed.motion_seed == 7
+        print(f"parse {len(parsed.models):6d} models:  {parse_time * 1e3:8.1f} ms")
+        print(f"cache {len(cached.models):6d} models:  {cache_time * 1e3:8.1f} ms  identical")
+
+        # Saving either world writes the same file
+        saved = []
+        for i, loaded in enumerate((parsed, cached)):
+            path = os.path.join(output_dir, f"saved_{i}.sdf")
+            loaded.save_sdf(path)
+            with open(path, "rb") as f:
+                saved.append(f.read())
+        assert saved[0] == saved[1], "saving the cached world gives a different SDF"
+
+        # A changed SDF of the same size is parsed again, not served from the old cache
+        with open(world_path, "rb") as f:
+            data = f.read()
+        changed = data.replace(b"<diffuse>0 0 0 1</diffuse>", b"<diffuse>1 1 1 1</diffuse>", 1)
+        assert changed != data and len(changed) == len(data)
+        with open(world_path, "wb") as f:
+            f.write(changed)
+        reloaded = WorldManager("gazebo", "harmonic")
+        reloaded.worlds_dir = output_dir
+        timed_load(reloaded, "bench_cache")
+        assert snapshot(reloaded) != snapshot(parsed), "a stale cache was used"
+        fresh = WorldManager("gazebo", "harmonic")
+        fresh.worlds_dir = output_dir
+        fresh.read_sdf(world_path)
+        assert snapshot(reloaded) == snapshot(fresh), "reload after a change differs from a full parse"
+        print("changed SDF:  cache refreshed")
+
+        # A truncated cache falls back to a full parse
+        with open(cache_path(world_path), "r+b") as f:
+            f.truncate(os.path.getsize(cache_path(world_path)) - 64)
+        corrupt = WorldManager("gazebo", "harmonic")
+        corrupt.worlds_dir = output_dir
+        timed_load(corrupt, "bench_cache")
+        assert snapshot(corrupt) == snapshot(fresh), "a truncated cache was used"
+        print("truncated cache:  ignored")
+
+
+if __name__ == "__main__":
+    main()
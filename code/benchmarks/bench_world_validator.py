@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Check find_conflicts on a small hand-built world with known overlaps, blocked paths and shapes that
+# only touch (flush against a wall or each other), then time it on a random world
+# Run from the code/ directory: python3 benchmarks/bench_world_validator.py [num_models]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from classes.world_validator import find_conflicts
+
+
+def wall(name, start, end, width=0.2):
+    return {"name": name, "type": "wall", "status": "",
+            "properties": {"start": start, "end": end, "width": width, "height": 1.0, "color": "Gray"}}
+
+
+def obstacle(name, model_type, position, size, path=None, status=""):
+    # A static obstacle, or a dynamic one moving back and forth from its position to path's end point
+    props = {"position": (position[0], position[1], 0.5), "size": size, "color": "Gray"}
+    if path is not None:
+        props["motion"] = {"type": "linear", "velocity": 1.0, "std": 0.0, "path": [position, path]}
+    return {"name": name, "type": model_type, "status": status, "properties": props}
+
+
+def hand_built_world():
+    return [
+        wall("wall_1", (0, 0), (10, 0)),
+        # Long diagonal wall, registered only along its segment in the broad phase
+        wall("wall_2", (20, 20), (60, 60)),
+        # Flush against wall_1 (its face is at y = 0.1) and overlapping it by 5 cm
+        obstacle("box_flush", "box", (2, 0.35), (0.5, 0.5, 1.0)),
+        obstacle("box_overlap", "box", (4, 0.3), (0.5, 0.5, 1.0)),
+        # Spheres touching, cylinders overlapping
+        obstacle("sphere_a", "sphere", (6, 1), (0.5,)),
+        obstacle("sphere_b", "sphere", (7, 1), (0.5,)),
+        obstacle("cylinder_a", "cylinder", (6, 3), (0.5, 1.0)),
+        obstacle("cylinder_b", "cylinder", (6.9, 3), (0.5, 1.0)),
+        # Boxes sharing an edge, boxes overlapping
+        obstacle("box_a", "box", (0, 5), (1.0, 1.0, 1.0)),
+        obstacle("box_b", "box", (1, 5), (1.0, 1.0, 1.0)),
+        obstacle("box_c", "box", (3, 5), (1.0, 1.0, 1.0)),
+        obstacle("box_d", "box", (3.5, 5.2), (1.0, 1.0, 1.0)),
+        # On the diagonal wall, and 0.7 m beside it
+        obstacle("box_diag", "box", (40, 40), (0.5, 0.5, 1.0)),
+        obstacle("box_beside", "box", (40, 41), (0.5, 0.5, 1.0)),
+        # A path through wall_1, a path ending flush on a static box and a path across a dynamic obstacle
+        obstacle("mover", "sphere", (8, 2), (0.2,), path=(8, -2)),
+        obstacle("mover_flush", "sphere", (15, 3), (0.25,), path=(15, 1)),
+        obstacle("box_target", "box", (15, 0.5), (1.0, 0.5, 1.0)),
+        obstacle("mover_cross", "sphere", (6, 2), (0.2,), path=(10, 2)),
+        # Models marked for removal are ignored
+        obstacle("box_removed", "box", (5, 0), (1.0, 1.0, 1.0), status="removed"),
+    ]
+
+
+def random_world(num_models, seed=0):
+    # Walls and a mix of static and dynamic obstacles scattered over a square
+    rng = random.Random(seed)
+    extent = max(10.0, num_models ** 0.5 * 2)
+    models = []
+    for i in range(num_models):
+        x, y = rng.uniform(-extent, extent), rng.uniform(-extent, extent)
+        if i % 10 == 0:
+            models.append(wall(f"wall_{i}", (x, y), (x + rng.uniform(-5, 5), y + rng.uniform(-5, 5))))
+        elif i % 10 == 1:
+            models.append(obstacle(f"sphere_{i}", "sphere", (x, y), (0.3,),
+                                   path=(x + rng.uniform(-3, 3), y + rng.uniform(-3, 3))))
+        else:
+            models.append(obstacle(f"box_{i}", "box", (x, y), (rng.uniform(0.2, 1), rng.uniform(0.2, 1), 1.0)))
+    return models
+
+
+def main():
+    num_models = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    models = hand_built_world()
+
+    # Touching shapes are not conflicts
+    conflicts = find_conflicts(models)
+    expected = [
+        ("box_c", "box_d", "overlap"),
+        ("box_diag", "wall_2", "overlap"),
+        ("box_overlap", "wall_1", "overlap"),
+        ("cylinder_a", "cylinder_b", "overlap"),
+        ("mover", "wall_1", "path"),
+    ]
+    assert conflicts == expected, conflicts
+    print(f"hand-built world:  {len(conflicts)} conflicts as expected")
+
+    # With clearance, the touching pairs are too close
+    conflicts = find_conflicts(models, clearance=0.1)
+    expected_clearance = sorted(expected + [
+        ("box_a", "box_b", "overlap"),
+        ("box_flush", "wall_1", "overlap"),
+        ("mover_flush", "box_target", "path"),
+        ("sphere_a", "sphere_b", "overlap"),
+    ])
+    assert conflicts == expected_clearance, conflicts
+    print(f"with 0.1 m clearance:  {len(conflicts)} conflicts as expected")
+
+    # Timing on a larger world
+    models = random_world(num_models)
+    start = time.perf_counter()
+    conflicts = find_conflicts(models)
+    elapsed = time.perf_counter() - start
+    print(f"random world {num_models:6d}:  {elapsed * 1e3:8.1f} ms  {len(conflicts)} conflicts")
+
+
+if __name__ == "__main__":
+    main()
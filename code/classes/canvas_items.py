@@ -0,0 +1,91 @@
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsPathItem, QGraphicsSimpleTextItem, QStyleOptionGraphicsItem
+from PyQt5.QtCore import QPointF, QRectF
+from PyQt5.QtGui import QPainterPath, QPolygonF
+import math
+
+# Zoom (view pixels per scene pixel) below which model labels are not drawn
+LABEL_MIN_LOD = 0.5
+# On-screen size in pixels below which an obstacle is drawn as a plain square mark
+MARK_MAX_PIXELS = 4
+MARK_PIXELS = 2
+# On-screen distance in pixels under which consecutive motion path points are merged
+PATH_TOLERANCE_PIXELS = 2
+
+
+def level_of_detail(painter):
+    # View pixels per scene pixel for the painter's current transform
+    return QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+
+
+def paint_mark(item, painter):
+    # Draw a tiny item as a small filled square instead of its outline; returns False if it is not tiny
+    lod = level_of_detail(painter)
+    rect = item.boundingRect()
+    if max(rect.width(), rect.height()) * lod >= MARK_MAX_PIXELS:
+        return False
+    size = MARK_PIXELS / lod
+    center = rect.center()
+    # The view does not widen exposed areas for antialiasing, so the mark must stay inside the bounding
+    # rect or panning leaves trails of it behind
+    mark = QRectF(center.x() - size / 2, center.y() - size / 2, size, size).intersected(rect)
+    painter.fillRect(mark, item.brush())
+    return True
+
+
+class LabelItem(QGraphicsSimpleTextItem):
+    def __init__(self, text):
+        # Model name label, rendered once per zoom level into a device pixmap
+        super().__init__(text)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
+    def paint(self, painter, option, widget=None):
+        # Skip the label when zoomed out too far to read it
+        if level_of_detail(painter) >= LABEL_MIN_LOD:
+            super().paint(painter, option, widget)
+
+
+class ObstacleRectItem(QGraphicsRectItem):
+    def paint(self, painter, option, widget=None):
+        # Draw the box, or a mark when it covers only a few pixels
+        if not paint_mark(self, painter):
+            super().paint(painter, option, widget)
+
+
+class ObstacleEllipseItem(QGraphicsEllipseItem):
+    def paint(self, painter, option, widget=None):
+        # Draw the cylinder or sphere, or a mark when it covers only a few pixels
+        if not paint_mark(self, painter):
+            super().paint(painter, option, widget)
+
+
+class MotionPathItem(QGraphicsPathItem):
+    def __init__(self, points):
+        # Motion path through scene points, drawn with fewer points when zoomed out
+        path = QPainterPath()
+        path.addPolygon(QPolygonF([QPointF(x, y) for x, y in points]))
+        super().__init__(path)
+        self.points = points
+        self.simplified = {}
+
+    def paint(self, painter, option, widget=None):
+        # Draw the full path at 1:1 and closer, otherwise a cached simplified polyline for the zoom level
+        lod = level_of_detail(painter)
+        if lod >= 1 or len(self.points) <= 2:
+            super().paint(painter, option, widget)
+            return
+        # Power-of-two zoom buckets keep the number of cached polylines small
+        bucket = 2.0 ** math.floor(math.log2(max(lod, 1e-6)))
+        polyline = self.simplified.get(bucket)
+        if polyline is None:
+            polyline = self.simplified[bucket] = self.simplify(PATH_TOLERANCE_PIXELS / bucket)
+        painter.setPen(self.pen())
+        painter.drawPolyline(polyline)
+
+    def simplify(self, tolerance):
+        # Drop points closer than tolerance to the last kept point, always keeping both ends
+        kept = [self.points[0]]
+        for x, y in self.points[1:-1]:
+            if math.hypot(x - kept[-1][0], y - kept[-1][1]) >= tolerance:
+                kept.append((x, y))
+        kept.append(self.points[-1])
+        return QPolygonF([QPointF(x, y) for x, y in kept])
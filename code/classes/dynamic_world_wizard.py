@@ -1,7 +1,11 @@
-from PyQt5.QtWidgets import QWizard, QListWidget, QVBoxLayout, QWidget, QGraphicsScene, QGraphicsRectItem, QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem
+from PyQt5.QtWidgets import QWizard, QListWidget, QVBoxLayout, QWidget, QGraphicsScene, QGraphicsLineItem, QMessageBox
 from PyQt5.QtCore import Qt, QRectF, QLineF, QPointF, pyqtProperty
 from PyQt5.QtGui import QFont, QPen, QColor
 from classes.world_manager import WorldManager
+from classes.canvas_items import LabelItem, ObstacleRectItem, ObstacleEllipseItem, MotionPathItem
+from classes.model_records import Box, MotionView, Obstacle, Wall, as_record
+from classes.motion_paths import trajectory_waypoints
+from classes.world_validator import describe_conflicts
 from classes.pages.welcome_page import WelcomePage
 from classes.pages.sim_selection_page import SimSelectionPage
 from classes.pages.walls_design_page import WallsDesignPage
@@ -9,7 +13,6 @@ from classes.pages.static_obstacles_page import StaticObstaclesPage
 from classes.pages.dynamic_obstacles_page import DynamicObstaclesPage
 from classes.pages.coming_soon_page import ComingSoonPage
 from utils.color_utils import get_color
-import math
 
 class DynamicWorldWizard(QWizard):
     def __init__(self):
@@ -26,6 +29,8 @@ class DynamicWorldWizard(QWizard):
         self.wall_items = {}
         self.obstacle_items = {}
         self.path_items = {}
+        # The views draw the grid in their background, so give the scene a large fixed extent to pan over
+        self.scene.setSceneRect(-100000, -100000, 200000, 200000)
 
         # Create navigation list
         self.nav_list = QListWidget()
@@ -112,95 +117,102 @@ class DynamicWorldWizard(QWizard):
                     widget.setMinimumWidth(150)
 
     def refresh_canvas(self, scene):
-        # Clear and redraw scene with grid and models
-        scene.clear()
-        self.path_items.clear()
-        grid_spacing = 10
-        for x in range(-1000, 1000, grid_spacing):
-            scene.addLine(x, -1000, x, 1000, QPen(QColor("lightgray")))
-        for y in range(-1000, 1000, grid_spacing):
-            scene.addLine(-1000, y, 1000, y, QPen(QColor("lightgray")))
-        self.wall_items.clear()
-        self.obstacle_items.clear()
-        self.path_items.clear()
+        # Redraw every model; only needed when the whole world is replaced
+        for name in list(self.wall_items) + list(self.obstacle_items) + list(self.path_items):
+            self.remove_model_items(name)
         if self.world_manager:
             for model in self.world_manager.models:
-                if model.get("status") == "removed":
-                    continue
-                if model["type"] == "wall":
-                    # Draw wall as a line with label
-                    start = QPointF(model["properties"]["start"][0] * 100, -model["properties"]["start"][1] * 100)
-                    end = QPointF(model["properties"]["end"][0] * 100, -model["properties"]["end"][1] * 100)
-                    color_rgb = get_color(model["properties"]["color"])
-                    qcolor = QColor.fromRgbF(*color_rgb)
-                    thickness = max(int(model["properties"]["width"] * 100), 2)
-                    line = QGraphicsLineItem(QLineF(start, end))
-                    line.setPen(QPen(qcolor, thickness))
-                    scene.addItem(line)
-                    text = QGraphicsTextItem(model["name"])
-                    text.setPos((start + end) / 2)
-                    scene.addItem(text)
-                    self.wall_items[model["name"]] = (line, text)
-                elif model["type"] in ["box", "cylinder", "sphere"]:
-                    # Draw obstacle as rectangle or ellipse with label
-                    position = model["properties"]["position"]
-                    size = model["properties"]["size"]
-                    center = QPointF(position[0] * 100, -position[1] * 100)
-                    if model["type"] == "box":
-                        W, L, _ = size
-                        half_width_pixels = (W / 2) * 100
-                        half_length_pixels = (L / 2) * 100
-                        rounded_half_width_pixels = round(half_width_pixels / 10) * 10
-                        rounded_half_length_pixels = round(half_length_pixels / 10) * 10
-                        rect_pixels = QRectF(center.x() - rounded_half_width_pixels, center.y() - rounded_half_length_pixels,
-                                             2 * rounded_half_width_pixels, 2 * rounded_half_length_pixels)
-                        item = QGraphicsRectItem(rect_pixels)
-                    else:
-                        R = size[0]
-                        radius_pixels = R * 100
-                        rect_pixels = QRectF(center.x() - radius_pixels, center.y() - radius_pixels, 2 * radius_pixels, 2 * radius_pixels)
-                        item = QGraphicsEllipseItem(rect_pixels)
-                    item.setPen(QPen(Qt.black, 2))
-                    color_rgb = get_color(model["properties"]["color"])
-                    item.setBrush(QColor.fromRgbF(*color_rgb))
-                    scene.addItem(item)
-                    text = QGraphicsTextItem(model["name"])
-                    text.setPos(center)
-                    scene.addItem(text)
-                    self.obstacle_items[model["name"]] = (item, text)
-                motion = model["properties"].get("motion")
-                if motion:
-                    # Draw motion paths (linear, elliptical, or polygon)
-                    type_ = motion["type"]
-                    color = {"linear": "red", "elliptical": "green", "polygon": "blue"}[type_]
-                    items = []
-                    if type_ == "linear":
-                        p1 = QPointF(motion["path"][0][0] * 100, -motion["path"][0][1] * 100)
-                        p2 = QPointF(motion["path"][1][0] * 100, -motion["path"][1][1] * 100)
-                        line = QGraphicsLineItem(QLineF(p1, p2))
-                        line.setPen(QPen(QColor(color), 2))
-                        scene.addItem(line)
-                        items.append(line)
-                    elif type_ == "elliptical":
-                        center_m = model["properties"]["position"][:2]
-                        center = QPointF(center_m[0] * 100, -center_m[1] * 100)
-                        semi_major = motion["semi_major"]
-                        semi_minor = motion["semi_minor"]
-                        angle = motion["angle"]
-                        ellipse = QGraphicsEllipseItem(QRectF(-semi_major * 100, -semi_minor * 100, 2 * semi_major * 100, 2 * semi_minor * 100))
-                        ellipse.setPos(center)
-                        ellipse.setRotation(-math.degrees(angle))
-                        ellipse.setPen(QPen(QColor(color), 2))
-                        scene.addItem(ellipse)
-                        items.append(ellipse)
-                    elif type_ == "polygon":
-                        points = [QPointF(p[0] * 100, -p[1] * 100) for p in motion["path"]]
-                        for i in range(len(points)):
-                            line = QGraphicsLineItem(QLineF(points[i], points[(i + 1) % len(points)]))
-                            line.setPen(QPen(QColor(color), 2))
-                            scene.addItem(line)
-                            items.append(line)
-                    self.path_items[model["name"]] = items
+                self.draw_model(model)
+
+    def model_at(self, view, pos, types=None):
+        # Name of the model under a view position, within a few screen pixels, or None
+        if not self.world_manager:
+            return None
+        point = view.mapToScene(pos)
+        tolerance = 5 / (100 * abs(view.transform().m11()))
+        hits = self.world_manager.get_spatial_index().pick(point.x() / 100, -point.y() / 100, tolerance, types)
+        return hits[0] if hits else None
+
+    def confirm_apply(self, parent):
+        # Check the world for collisions before an apply; True if there are none or the user applies anyway
+        conflicts = self.world_manager.validate()
+        if not conflicts:
+            return True
+        message = "\n".join(describe_conflicts(conflicts))
+        answer = QMessageBox.question(parent, "Conflicts Found",
+                                      f"Found {len(conflicts)} conflicts:\n{message}\n\nApply changes anyway?",
+                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
+
+    def model_changed(self, event, model):
+        # Keep the canvas in sync with a single model change reported by the world manager
+        if event == "reset":
+            self.refresh_canvas(self.scene)
+        elif event == "removed":
+            self.remove_model_items(model["name"])
+        else:
+            self.remove_model_items(model["name"])
+            self.draw_model(model)
+
+    def remove_model_items(self, name):
+        # Remove the shape, label and motion path items of one model from the scene
+        for item in self.wall_items.pop(name, ()) + self.obstacle_items.pop(name, ()):
+            self.scene.removeItem(item)
+        for item in self.path_items.pop(name, []):
+            self.scene.removeItem(item)
+
+    def draw_model(self, model):
+        # Add the items of one model to the scene
+        scene = self.scene
+        record = as_record(model)
+        if record.status == "removed":
+            return
+        if isinstance(record, Wall):
+            # Draw wall as a line with label
+            start = QPointF(record.start_x * 100, -record.start_y * 100)
+            end = QPointF(record.end_x * 100, -record.end_y * 100)
+            color_rgb = get_color(record.color)
+            qcolor = QColor.fromRgbF(*color_rgb)
+            thickness = max(int(record.width * 100), 2)
+            line = QGraphicsLineItem(QLineF(start, end))
+            line.setPen(QPen(qcolor, thickness))
+            scene.addItem(line)
+            text = LabelItem(record.name)
+            text.setPos((start + end) / 2)
+            scene.addItem(text)
+            self.wall_items[record.name] = (line, text)
+        elif isinstance(record, Obstacle):
+            # Draw obstacle as rectangle or ellipse with label
+            center = QPointF(record.x * 100, -record.y * 100)
+            if isinstance(record, Box):
+                half_width_pixels = (record.width / 2) * 100
+                half_length_pixels = (record.length / 2) * 100
+                rounded_half_width_pixels = round(half_width_pixels / 10) * 10
+                rounded_half_length_pixels = round(half_length_pixels / 10) * 10
+                rect_pixels = QRectF(center.x() - rounded_half_width_pixels, center.y() - rounded_half_length_pixels,
+                                     2 * rounded_half_width_pixels, 2 * rounded_half_length_pixels)
+                item = ObstacleRectItem(rect_pixels)
+            else:
+                radius_pixels = record.radius * 100
+                rect_pixels = QRectF(center.x() - radius_pixels, center.y() - radius_pixels, 2 * radius_pixels, 2 * radius_pixels)
+                item = ObstacleEllipseItem(rect_pixels)
+            item.setPen(QPen(Qt.black, 2))
+            color_rgb = get_color(record.color)
+            item.setBrush(QColor.fromRgbF(*color_rgb))
+            scene.addItem(item)
+            text = LabelItem(record.name)
+            text.setPos(center)
+            scene.addItem(text)
+            self.obstacle_items[record.name] = (item, text)
+            motion = record.motion
+            if motion is not None:
+                # Draw the motion path (linear, elliptical, or polygon) as one polyline
+                color = {"linear": "red", "elliptical": "green", "polygon": "blue"}[motion.type]
+                points = [(x * 100, -y * 100) for _, x, y in trajectory_waypoints((record.x, record.y), MotionView(motion))]
+                path = MotionPathItem(points)
+                path.setPen(QPen(QColor(color), 2))
+                scene.addItem(path)
+                self.path_items[record.name] = [path]
 
     def closeEvent(self, event):
         # Clean up world manager on window close
@@ -209,11 +221,15 @@ class DynamicWorldWizard(QWizard):
         event.accept()
 
     def initialize_world_manager(self, sim_type, version):
-        # Initialize world manager for selected simulation
+        # Initialize world manager for selected simulation and follow its model changes on the canvas
+        if self.world_manager:
+            self.world_manager.remove_model_listener(self.model_changed)
         if sim_type == "gazebo" and version in ["fortress", "harmonic"]:
             self.world_manager = WorldManager(sim_type, version)
+            self.world_manager.add_model_listener(self.model_changed)
         else:
             self.world_manager = None
+        self.refresh_canvas(self.scene)
 
     def update_navigation(self, page_id):
         # Sync navigation list with current wizard page
@@ -0,0 +1,246 @@
+import re
+import subprocess
+import time
+from xml.etree import ElementTree as ET
+
+class GazeboTransport:
+    # Interface for the world edit services; WorldManager only talks to Gazebo through these calls
+    def create_entities(self, world_name, sdf_snippets):
+        # Spawn each SDF snippet, returning one success flag per snippet
+        raise NotImplementedError
+
+    def remove_entities(self, world_name, names):
+        # Remove models by name, returning one success flag per name
+        raise NotImplementedError
+
+    def set_poses(self, world_name, names, poses):
+        # Move every named model to its (x, y, z) position, returning whether all requests succeeded
+        raise NotImplementedError
+
+    def is_world_ready(self, world_name):
+        # Check whether the world's entity services are advertised
+        raise NotImplementedError
+
+    def list_models(self, world_name):
+        # Return the names of the models currently in the scene
+        raise NotImplementedError
+
+    def close(self):
+        # Release any resources held by the transport
+        pass
+
+
+class CliTransport(GazeboTransport):
+    def __init__(self, version):
+        # Call services through the ign/gz command line tool (one process per request)
+        self.prefix = "ign" if version == "fortress" else "gz"
+        self.reqtype_prefix = "ignition.msgs" if version == "fortress" else "gz.msgs"
+        # A single CLI argument is capped at 128 KiB on Linux
+        self.max_request_bytes = 100000
+
+    def _command(self, service, reqtype, timeout, request_str):
+        # Build a service call command line
+        return [self.prefix, "service", "-s", service,
+                "--reqtype", f"{self.reqtype_prefix}.{reqtype}",
+                "--reptype", f"{self.reqtype_prefix}.Boolean",
+                "--timeout", str(timeout),
+                "--req", request_str]
+
+    def _batches(self, entries):
+        # Group request entries so that no joined request exceeds the argument limit
+        batches = []
+        batch, batch_bytes = [], 0
+        for entry in entries:
+            if batch and batch_bytes + len(entry) > self.max_request_bytes:
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(entry)
+            batch_bytes += len(entry) + 1
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def create_entities(self, world_name, sdf_snippets):
+        # Send snippets through create_multiple, splitting requests that would exceed the argument limit
+        entries = []
+        for sdf in sdf_snippets:
+            sdf_escaped = sdf.replace('"', '\\"')
+            sdf_compact = ' '.join(sdf_escaped.split())
+            entries.append(f'data {{ sdf: "{sdf_compact}" }}')
+
+        results = []
+        for batch in self._batches(entries):
+            cmd = self._command(f"/world/{world_name}/create_multiple", "EntityFactory_V",
+                                3000 + 100 * len(batch), " ".join(batch))
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            success = result.returncode == 0 and "data: true" in result.stdout
+            results.extend([success] * len(batch))
+        return results
+
+    def remove_entities(self, world_name, names):
+        # Gazebo has no multi-entity remove service, so the requests are issued concurrently
+        processes = []
+        for name in names:
+            cmd = self._command(f"/world/{world_name}/remove", "Entity", 3000, f'name: "{name}", type: 2')
+            processes.append(subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True))
+        results = []
+        for process in processes:
+            process.communicate()
+            results.append(process.returncode == 0)
+        return results
+
+    def set_poses(self, world_name, names, poses):
+        # Send Pose_V requests to set_pose_vector, one process per batch that fits the argument limit
+        entries = [f'pose {{ name: "{name}" position {{ x: {x} y: {y} z: {z} }} orientation {{ w: 1 }} }}'
+                   for name, (x, y, z) in zip(names, poses)]
+        for batch in self._batches(entries):
+            cmd = self._command(f"/world/{world_name}/set_pose_vector", "Pose_V", 500, " ".join(batch))
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                return False
+        return True
+
+    def is_world_ready(self, world_name):
+        # Look for the create service in the advertised service list
+        result = subprocess.run([self.prefix, "service", "-l"], capture_output=True, text=True)
+        return f"/world/{world_name}/create_multiple" in result.stdout.split()
+
+    def list_models(self, world_name):
+        # Read top-level model names from the scene/info service
+        cmd = [self.prefix, "service", "-s", f"/world/{world_name}/scene/info",
+               "--reqtype", f"{self.reqtype_prefix}.Empty",
+               "--reptype", f"{self.reqtype_prefix}.Scene",
+               "--timeout", "1000",
+               "--req", ""]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return set()
+        return set(re.findall(r'^model \{\s*name: "([^"]*)"', result.stdout, re.MULTILINE))
+
+
+class NodeTransport(GazeboTransport):
+    def __init__(self):
+        # Keep one gz.transport node open for the lifetime of the world manager
+        from gz.transport13 import Node
+        from gz.msgs10.boolean_pb2 import Boolean
+        from gz.msgs10.empty_pb2 import Empty
+        from gz.msgs10.entity_factory_v_pb2 import EntityFactory_V
+        from gz.msgs10.entity_pb2 import Entity
+        from gz.msgs10.pose_v_pb2 import Pose_V
+        from gz.msgs10.scene_pb2 import Scene
+        self.node = Node()
+        self.Empty = Empty
+        self.Boolean = Boolean
+        self.EntityFactory_V = EntityFactory_V
+        self.Entity = Entity
+        self.Pose_V = Pose_V
+        self.Scene = Scene
+        self.timeout = 3000
+
+    def create_entities(self, world_name, sdf_snippets):
+        # Send all snippets in a single create_multiple request
+        req = self.EntityFactory_V()
+        for sdf in sdf_snippets:
+            req.data.add().sdf = sdf
+        success, rep = self.node.request(f"/world/{world_name}/create_multiple", req,
+                                         self.EntityFactory_V, self.Boolean, self.timeout + 100 * len(sdf_snippets))
+        return [bool(success and rep.data)] * len(sdf_snippets)
+
+    def remove_entities(self, world_name, names):
+        # Remove models one request at a time over the open node
+        results = []
+        for name in names:
+            req = self.Entity()
+            req.name = name
+            req.type = self.Entity.MODEL
+            success, rep = self.node.request(f"/world/{world_name}/remove", req,
+                                             self.Entity, self.Boolean, self.timeout)
+            results.append(bool(success and rep.data))
+        return results
+
+    def set_poses(self, world_name, names, poses):
+        # Send every pose in a single set_pose_vector request
+        req = self.Pose_V()
+        for name, (x, y, z) in zip(names, poses):
+            pose = req.pose.add()
+            pose.name = name
+            pose.position.x = x
+            pose.position.y = y
+            pose.position.z = z
+            pose.orientation.w = 1.0
+        success, rep = self.node.request(f"/world/{world_name}/set_pose_vector", req, self.Pose_V, self.Boolean, 500)
+        return bool(success and rep.data)
+
+    def is_world_ready(self, world_name):
+        # Look for the create service in the advertised service list
+        return f"/world/{world_name}/create_multiple" in self.node.service_list()
+
+    def list_models(self, world_name):
+        # Read model names from the scene/info service
+        success, rep = self.node.request(f"/world/{world_name}/scene/info", self.Empty(),
+                                         self.Empty, self.Scene, 1000)
+        if not success:
+            return set()
+        return {model.name for model in rep.model}
+
+
+class FakeTransport(GazeboTransport):
+    def __init__(self, latency=0.0):
+        # In-memory stand-in for Gazebo, used for tests and benchmarks
+        self.latency = latency
+        self.entities = {}
+        self.poses = {}
+        self.calls = 0
+
+    def _call(self):
+        # Count the request and simulate its round trip
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_entities(self, world_name, sdf_snippets):
+        # Record each spawned model by name
+        self._call()
+        results = []
+        for sdf in sdf_snippets:
+            model_elem = ET.fromstring(sdf).find("model")
+            if model_elem is None or model_elem.get("name") in self.entities:
+                results.append(False)
+                continue
+            self.entities[model_elem.get("name")] = sdf
+            results.append(True)
+        return results
+
+    def remove_entities(self, world_name, names):
+        # Forget removed models
+        self._call()
+        return [self.entities.pop(name, None) is not None for name in names]
+
+    def set_poses(self, world_name, names, poses):
+        # Record the latest pose of each known model; unknown names fail the request
+        self._call()
+        success = True
+        for name, pose in zip(names, poses):
+            if name not in self.entities:
+                success = False
+                continue
+            self.poses[name] = tuple(pose)
+        return success
+
+    def is_world_ready(self, world_name):
+        # The fake world is available immediately
+        return True
+
+    def list_models(self, world_name):
+        # Every recorded model is visible at once
+        return set(self.entities)
+
+
+def create_transport(version):
+    # Prefer an in-process gz.transport node and fall back to the command line tool
+    if version == "harmonic":
+        try:
+            return NodeTransport()
+        except ImportError:
+            pass
+    return CliTransport(version)
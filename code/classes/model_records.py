@@ -0,0 +1,293 @@
+from collections.abc import Mapping
+from operator import attrgetter
+from types import MappingProxyType
+
+MOTION_FIELDS = ("type", "velocity", "std", "path", "semi_major", "semi_minor", "angle", "seed")
+
+
+def read_only(properties):
+    # Read-only view of a properties dict: sequences become tuples and the motion a read-only mapping too
+    view = {key: tuple(value) if isinstance(value, list) else value for key, value in properties.items()}
+    motion = view.get("motion")
+    if motion is not None:
+        motion = dict(motion)
+        if "path" in motion:
+            motion["path"] = tuple(tuple(p) for p in motion["path"])
+        view["motion"] = MappingProxyType(motion)
+    return MappingProxyType(view)
+
+
+class PropertiesView(Mapping):
+    __slots__ = ("_record",)
+
+    def __init__(self, record):
+        # Read-only properties of a typed record, read from its fields on access instead of copied;
+        # item assignment raises TypeError
+        self._record = record
+
+    def __getitem__(self, key):
+        value = self._record.property_getters[key](self._record)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        record = self._record
+        return iter([key for key, getter in record.property_getters.items() if getter(record) is not None])
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return f"PropertiesView({dict(self)!r})"
+
+
+class MotionView(Mapping):
+    __slots__ = ("_motion",)
+
+    def __init__(self, motion):
+        # Read-only motion dict over a Motion record; fields that are not set are missing keys
+        self._motion = motion
+
+    def __getitem__(self, key):
+        if key not in MOTION_FIELDS:
+            raise KeyError(key)
+        value = getattr(self._motion, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return iter([key for key in MOTION_FIELDS if getattr(self._motion, key) is not None])
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return f"MotionView({dict(self)!r})"
+
+
+class Motion:
+    __slots__ = MOTION_FIELDS
+
+    def __init__(self, type, velocity=None, std=None, path=None, semi_major=None, semi_minor=None, angle=None,
+                 seed=None):
+        # Motion definition of a dynamic obstacle; unused fields stay None
+        self.type = type
+        self.velocity = velocity
+        self.std = std
+        self.path = tuple(tuple(p) for p in path) if path is not None else None
+        self.semi_major = semi_major
+        self.semi_minor = semi_minor
+        self.angle = angle
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, motion):
+        # Build a motion record from a motion dict
+        return cls(motion["type"], motion.get("velocity"), motion.get("std"), motion.get("path"),
+                   motion.get("semi_major"), motion.get("semi_minor"), motion.get("angle"), motion.get("seed"))
+
+    def to_dict(self):
+        # Convert back to a motion dict, keeping only the fields that are set
+        motion = {"type": self.type}
+        for key in ("velocity", "std", "path", "semi_major", "semi_minor", "angle", "seed"):
+            value = getattr(self, key)
+            if value is not None:
+                motion[key] = list(value) if key == "path" else value
+        return motion
+
+
+class ModelRecord:
+    __slots__ = ("name", "status")
+
+    def __init__(self, name, status=""):
+        # Common fields of every model record
+        self.name = name
+        self.status = status
+
+    def to_dict(self):
+        # Convert to the model dict format used by the pages and WorldManager
+        return {"name": self.name, "type": self.model_type, "properties": self.properties(), "status": self.status}
+
+    def __getitem__(self, key):
+        # Read a field like from a model dict. "properties" is a read-only view over the record's fields, so
+        # editing it raises TypeError: pass an updated model dict (e.g. from to_dict) to ModelStore.add instead.
+        # Code walking many models should read the typed fields directly (see as_record).
+        if key == "name":
+            return self.name
+        if key == "type":
+            return self.model_type
+        if key == "status":
+            return self.status
+        if key == "properties":
+            return self.properties_view()
+        raise KeyError(key)
+
+    def properties_view(self):
+        return PropertiesView(self)
+
+    def get(self, key, default=None):
+        # dict.get for the model dict fields
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in ("name", "type", "properties", "status")
+
+
+class Wall(ModelRecord):
+    __slots__ = ("start_x", "start_y", "end_x", "end_y", "width", "height", "color")
+    model_type = "wall"
+    property_getters = {
+        "start": lambda r: (r.start_x, r.start_y),
+        "end": lambda r: (r.end_x, r.end_y),
+        "width": attrgetter("width"),
+        "height": attrgetter("height"),
+        "color": attrgetter("color"),
+    }
+
+    def __init__(self, name, start, end, width, height, color="Gray", status=""):
+        # Wall segment between two points in meters
+        super().__init__(name, status)
+        self.start_x, self.start_y = start
+        self.end_x, self.end_y = end
+        self.width = width
+        self.height = height
+        self.color = color
+
+    @classmethod
+    def from_dict(cls, model):
+        # Build a wall record from a model dict
+        props = model["properties"]
+        return cls(model["name"], props["start"], props["end"], props["width"], props["height"],
+                   props["color"], model.get("status", ""))
+
+    def properties(self):
+        # Return the properties dict of this wall
+        return {
+            "start": (self.start_x, self.start_y),
+            "end": (self.end_x, self.end_y),
+            "width": self.width,
+            "height": self.height,
+            "color": self.color
+        }
+
+
+class Obstacle(ModelRecord):
+    __slots__ = ("x", "y", "z", "color", "motion")
+    property_getters = {
+        "position": lambda r: (r.x, r.y, r.z),
+        "size": lambda r: r.size(),
+        "color": attrgetter("color"),
+        "motion": lambda r: MotionView(r.motion) if r.motion is not None else None,
+    }
+
+    def __init__(self, name, position, color="Gray", motion=None, status=""):
+        # Obstacle centered at a position in meters, optionally with a motion
+        super().__init__(name, status)
+        self.x, self.y, self.z = position
+        self.color = color
+        self.motion = motion
+
+    @classmethod
+    def from_dict(cls, model):
+        # Build an obstacle record from a model dict
+        props = model["properties"]
+        motion = Motion.from_dict(props["motion"]) if "motion" in props else None
+        return cls(model["name"], props["position"], *props["size"], color=props["color"], motion=motion,
+                   status=model.get("status", ""))
+
+    def properties(self):
+        # Return the properties dict of this obstacle
+        props = {"position": (self.x, self.y, self.z), "size": self.size(), "color": self.color}
+        if self.motion is not None:
+            props["motion"] = self.motion.to_dict()
+        return props
+
+
+class Box(Obstacle):
+    __slots__ = ("width", "length", "height")
+    model_type = "box"
+
+    def __init__(self, name, position, width, length, height, color="Gray", motion=None, status=""):
+        # Box with width, length and height in meters
+        super().__init__(name, position, color, motion, status)
+        self.width = width
+        self.length = length
+        self.height = height
+
+    def size(self):
+        return (self.width, self.length, self.height)
+
+
+class Cylinder(Obstacle):
+    __slots__ = ("radius", "length")
+    model_type = "cylinder"
+
+    def __init__(self, name, position, radius, length, color="Gray", motion=None, status=""):
+        # Upright cylinder with radius and length in meters
+        super().__init__(name, position, color, motion, status)
+        self.radius = radius
+        self.length = length
+
+    def size(self):
+        return (self.radius, self.length)
+
+
+class Sphere(Obstacle):
+    __slots__ = ("radius",)
+    model_type = "sphere"
+
+    def __init__(self, name, position, radius, color="Gray", motion=None, status=""):
+        # Sphere with radius in meters
+        super().__init__(name, position, color, motion, status)
+        self.radius = radius
+
+    def size(self):
+        return (self.radius,)
+
+
+class OtherModel(ModelRecord):
+    __slots__ = ("model_type", "props")
+
+    def __init__(self, name, model_type, props, status=""):
+        # Model that was not created by the wizard (e.g. ground_plane); properties are kept as-is
+        super().__init__(name, status)
+        self.model_type = model_type
+        self.props = props
+
+    @classmethod
+    def from_dict(cls, model):
+        # Build a record from a model dict of any type
+        props = dict(model["properties"])
+        if "motion" in props:
+            # The motion may be the read-only view of another record
+            props["motion"] = dict(props["motion"])
+        return cls(model["name"], model["type"], props, model.get("status", ""))
+
+    def properties(self):
+        return dict(self.props)
+
+    def properties_view(self):
+        return read_only(self.props)
+
+
+RECORD_TYPES = {"wall": Wall, "box": Box, "cylinder": Cylinder, "sphere": Sphere}
+
+
+def record_from_dict(model):
+    # Convert a model dict to the matching typed record; models missing the fields of their type
+    # (e.g. a foreign model named like a wall) are kept as they are
+    record_type = RECORD_TYPES.get(model["type"], OtherModel)
+    try:
+        return record_type.from_dict(model)
+    except (KeyError, TypeError, ValueError):
+        return OtherModel.from_dict(model)
+
+
+def as_record(model):
+    # The typed record of a model dict or record, for code that reads the fields of many models
+    return model if isinstance(model, ModelRecord) else record_from_dict(model)
@@ -0,0 +1,80 @@
+from classes.model_records import ModelRecord, record_from_dict
+
+
+class ModelStore:
+    def __init__(self, models=()):
+        # Models keyed by name, with secondary indexes by type and by status. Models are kept as compact
+        # typed records, which read like model dicts; add() takes either
+        self._models = {}
+        self._by_type = {}
+        self._by_status = {}
+        for model in models:
+            self.add(model)
+
+    def __iter__(self):
+        # Iterate models in insertion order, like the list this store replaces
+        return iter(list(self._models.values()))
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def get(self, name, default=None):
+        # Look up a model by name
+        return self._models.get(name, default)
+
+    def names(self):
+        # Return all model names in insertion order
+        return list(self._models)
+
+    def add(self, model):
+        # Add a model, or replace the existing model with the same name (keeping its position);
+        # returns the stored record
+        record = model if isinstance(model, ModelRecord) else record_from_dict(model)
+        existing = self._models.get(record.name)
+        if existing is not None:
+            self._unindex(existing)
+        self._models[record.name] = record
+        self._index(record)
+        return record
+
+    def remove(self, name):
+        # Drop a model from the store entirely
+        model = self._models.pop(name, None)
+        if model is not None:
+            self._unindex(model)
+        return model
+
+    def set_status(self, name, status):
+        # Change a model's status and keep the status index in sync
+        model = self._models[name]
+        self._by_status.get(model.status, {}).pop(name, None)
+        model.status = status
+        self._by_status.setdefault(status, {})[name] = model
+        return model
+
+    def of_type(self, *types):
+        # Return the models of the given types
+        return [model for model_type in types for model in self._by_type.get(model_type, {}).values()]
+
+    def with_status(self, *statuses):
+        # Return the models with any of the given statuses
+        return [model for status in statuses for model in self._by_status.get(status, {}).values()]
+
+    def clear(self):
+        # Remove all models
+        self._models.clear()
+        self._by_type.clear()
+        self._by_status.clear()
+
+    def _index(self, model):
+        # Register a model in the secondary indexes
+        self._by_type.setdefault(model.model_type, {})[model.name] = model
+        self._by_status.setdefault(model.status, {})[model.name] = model
+
+    def _unindex(self, model):
+        # Remove a model from the secondary indexes
+        self._by_type.get(model.model_type, {}).pop(model.name, None)
+        self._by_status.get(model.status, {}).pop(model.name, None)
@@ -0,0 +1,40 @@
+import math
+
+# Number of waypoints used to approximate one revolution of an elliptical path
+ELLIPSE_SEGMENTS = 72
+
+
+def trajectory_waypoints(position, motion):
+    # Return (time, x, y) waypoints for one period of a motion at its nominal velocity.
+    # Speed noise (std) has no fixed-trajectory equivalent and is not represented.
+    velocity = max(motion["velocity"], 1e-6)
+    if motion["type"] == "elliptical":
+        cx, cy = position[0], position[1]
+        a, b = motion["semi_major"], motion["semi_minor"]
+        cos_angle, sin_angle = math.cos(motion["angle"]), math.sin(motion["angle"])
+        waypoints = []
+        for i in range(ELLIPSE_SEGMENTS + 1):
+            # The motion script advances theta by velocity / semi_major per second
+            theta = 2 * math.pi * i / ELLIPSE_SEGMENTS
+            a_cos, b_sin = a * math.cos(theta), b * math.sin(theta)
+            waypoints.append((theta * a / velocity,
+                              cx + a_cos * cos_angle - b_sin * sin_angle,
+                              cy + a_cos * sin_angle + b_sin * cos_angle))
+        return waypoints
+
+    path = [tuple(p) for p in motion["path"]]
+    if motion["type"] == "linear":
+        # Out to the end point and back again
+        points = [path[0], path[1], path[0]]
+    else:
+        # Around the polygon and back to the first vertex
+        points = path + [path[0]]
+    waypoints = [(0.0, points[0][0], points[0][1])]
+    for prev, point in zip(points, points[1:]):
+        t = waypoints[-1][0] + math.hypot(point[0] - prev[0], point[1] - prev[1]) / velocity
+        waypoints.append((t, point[0], point[1]))
+    if waypoints[-1][0] <= 0.0:
+        # Degenerate path: hold the obstacle in place
+        waypoints = [(0.0, points[0][0], points[0][1]), (1.0, points[0][0], points[0][1])]
+    return waypoints
+
@@ -0,0 +1,520 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from classes.gazebo_transport import create_transport
+from classes.motion_scenario import read_scenario, write_scenario
+
+
+class NoiseStream:
+    def __init__(self, names, seed=None, chunk=1024):
+        # Standard normal draws for a group of obstacles, generated chunk ticks at a time.
+        # With a seed every obstacle gets its own stream derived from (seed, name), so the
+        # draws do not depend on how obstacles are grouped, ordered or sharded.
+        self.chunk = chunk
+        if seed is None:
+            self.generators = None
+            self.rng = np.random.default_rng()
+        else:
+            self.generators = [np.random.default_rng([seed, zlib.crc32(name.encode("utf-8"))]) for name in names]
+        self.buffer = np.empty((chunk, len(names)))
+        self.index = chunk
+
+    def next(self):
+        # Return one draw per obstacle for the current tick
+        if self.index == self.chunk:
+            if self.generators is None:
+                self.buffer = self.rng.standard_normal(self.buffer.shape)
+            else:
+                for column, generator in enumerate(self.generators):
+                    self.buffer[:, column] = generator.standard_normal(self.chunk)
+            self.index = 0
+        row = self.buffer[self.index]
+        self.index += 1
+        return row
+
+
+class MotionEngine:
+    def __init__(self, obstacles, seed=None):
+        # Group obstacles by motion type into arrays and precompute their path geometry once
+        self.seed = seed
+        self.specs = {o["name"]: o for o in obstacles}
+        linear = [o for o in obstacles if o["motion"]["type"] == "linear"]
+        elliptical = [o for o in obstacles if o["motion"]["type"] == "elliptical"]
+        polygon = [o for o in obstacles if o["motion"]["type"] == "polygon"]
+
+        self.linear_names = [o["name"] for o in linear]
+        self.linear_start = np.array([o["motion"]["path"][0] for o in linear], dtype=float).reshape(-1, 2)
+        self.linear_end = np.array([o["motion"]["path"][1] for o in linear], dtype=float).reshape(-1, 2)
+        self.linear_velocity, self.linear_std, self.linear_z = self._common(linear)
+        delta = self.linear_end - self.linear_start
+        self.linear_length = np.hypot(delta[:, 0], delta[:, 1])
+        self.linear_valid = self.linear_length >= 0.001
+        self.linear_unit = delta / np.where(self.linear_valid, self.linear_length, 1.0)[:, None]
+        self.linear_s = np.zeros(len(linear))
+        self.linear_direction = np.ones(len(linear))
+        self.linear_noise = NoiseStream(self.linear_names, seed)
+
+        self.elliptical_names = [o["name"] for o in elliptical]
+        self.elliptical_center = np.array([o["center"] for o in elliptical], dtype=float).reshape(-1, 2)
+        self.elliptical_semi_major = np.array([o["motion"]["semi_major"] for o in elliptical], dtype=float)
+        self.elliptical_semi_minor = np.array([o["motion"]["semi_minor"] for o in elliptical], dtype=float)
+        angle = np.array([o["motion"]["angle"] for o in elliptical], dtype=float)
+        self.elliptical_cos = np.cos(angle)
+        self.elliptical_sin = np.sin(angle)
+        self.elliptical_velocity, self.elliptical_std, self.elliptical_z = self._common(elliptical)
+        self.elliptical_theta = np.zeros(len(elliptical))
+        self.elliptical_noise = NoiseStream(self.elliptical_names, seed)
+
+        # Polygon vertices are padded to the longest path; cumulative arc lengths past the
+        # last vertex are infinite so the segment lookup never selects a padding segment
+        self.polygon_names = [o["name"] for o in polygon]
+        max_vertices = max((len(o["motion"]["path"]) for o in polygon), default=1)
+        self.polygon_start = np.zeros((len(polygon), max_vertices, 2))
+        self.polygon_delta = np.zeros((len(polygon), max_vertices, 2))
+        self.polygon_cumulative = np.full((len(polygon), max_vertices + 1), np.inf)
+        for i, o in enumerate(polygon):
+            points = np.array(o["motion"]["path"], dtype=float)
+            deltas = np.roll(points, -1, axis=0) - points
+            self.polygon_start[i, :len(points)] = points
+            self.polygon_delta[i, :len(points)] = deltas
+            self.polygon_cumulative[i, 0] = 0.0
+            self.polygon_cumulative[i, 1:len(points) + 1] = np.cumsum(np.hypot(deltas[:, 0], deltas[:, 1]))
+        self.polygon_vertices = np.array([len(o["motion"]["path"]) for o in polygon], dtype=int)
+        self.polygon_rows = np.arange(len(polygon))
+        self.polygon_perimeter = self.polygon_cumulative[self.polygon_rows, self.polygon_vertices]
+        self.polygon_valid = self.polygon_perimeter >= 0.001
+        self.polygon_velocity, self.polygon_std, self.polygon_z = self._common(polygon)
+        self.polygon_s = np.zeros(len(polygon))
+        self.polygon_noise = NoiseStream(self.polygon_names, seed)
+
+        # Obstacles on paths shorter than a millimetre are never published
+        self.names = ([n for n, ok in zip(self.linear_names, self.linear_valid.tolist()) if ok] + self.elliptical_names +
+                      [n for n, ok in zip(self.polygon_names, self.polygon_valid.tolist()) if ok])
+        self.z = np.concatenate([self.linear_z[self.linear_valid], self.elliptical_z,
+                                 self.polygon_z[self.polygon_valid]])
+        # Seeded motion advances in whole ticks so it can be reproduced exactly
+        self.fixed_step = seed is not None
+
+    def __len__(self):
+        return len(self.linear_names) + len(self.elliptical_names) + len(self.polygon_names)
+
+    @staticmethod
+    def _common(obstacles):
+        # Velocity, velocity std and height arrays shared by every motion type
+        return (np.array([o["motion"]["velocity"] for o in obstacles], dtype=float),
+                np.array([o["motion"]["std"] for o in obstacles], dtype=float),
+                np.array([o["z"] for o in obstacles], dtype=float))
+
+    def phases(self):
+        # Current phase of every obstacle: linear arc length and direction, ellipse parameter
+        # or polygon arc length
+        phases = {}
+        for name, s, direction in zip(self.linear_names, self.linear_s.tolist(), self.linear_direction.tolist()):
+            phases[name] = (s, direction)
+        for name, theta in zip(self.elliptical_names, self.elliptical_theta.tolist()):
+            phases[name] = (theta,)
+        for name, s in zip(self.polygon_names, self.polygon_s.tolist()):
+            phases[name] = (s,)
+        return phases
+
+    def restore_phases(self, phases):
+        # Continue obstacles from the given phases; obstacles not listed start from the beginning
+        for i, name in enumerate(self.linear_names):
+            if name in phases:
+                self.linear_s[i], self.linear_direction[i] = phases[name]
+        for i, name in enumerate(self.elliptical_names):
+            if name in phases:
+                self.elliptical_theta[i], = phases[name]
+        for i, name in enumerate(self.polygon_names):
+            if name in phases:
+                self.polygon_s[i], = phases[name]
+
+    @staticmethod
+    def sample_velocity(velocity, std, noise):
+        # Noisy speed per obstacle, clamped to [0, 2 * velocity]
+        return np.clip(velocity + std * noise.next(), 0, velocity * 2)
+
+    def step_linear(self, dt):
+        # Move back and forth between start and end, turning around at either end
+        s = self.linear_s + self.linear_direction * self.sample_velocity(self.linear_velocity, self.linear_std, self.linear_noise) * dt
+        past_end = s > self.linear_length
+        before_start = s < 0
+        self.linear_s = np.clip(s, 0, self.linear_length)
+        self.linear_direction = np.where(past_end, -1.0, np.where(before_start, 1.0, self.linear_direction))
+        return self.linear_start + self.linear_unit * self.linear_s[:, None]
+
+    def step_elliptical(self, dt):
+        # Advance the ellipse parameter and rotate the point by the ellipse angle
+        velocity = self.sample_velocity(self.elliptical_velocity, self.elliptical_std, self.elliptical_noise)
+        self.elliptical_theta = self.elliptical_theta + velocity / self.elliptical_semi_major * dt
+        a_cos = self.elliptical_semi_major * np.cos(self.elliptical_theta)
+        b_sin = self.elliptical_semi_minor * np.sin(self.elliptical_theta)
+        x = self.elliptical_center[:, 0] + a_cos * self.elliptical_cos - b_sin * self.elliptical_sin
+        y = self.elliptical_center[:, 1] + a_cos * self.elliptical_sin + b_sin * self.elliptical_cos
+        return np.stack([x, y], axis=1)
+
+    def step_polygon(self, dt):
+        # Advance the arc length around the closed polygon and locate the current segment
+        s = self.polygon_s + self.sample_velocity(self.polygon_velocity, self.polygon_std, self.polygon_noise) * dt
+        perimeter = np.where(self.polygon_valid, self.polygon_perimeter, 1.0)
+        self.polygon_s = np.where(self.polygon_valid, np.mod(s, perimeter), 0.0)
+        segment = np.minimum((self.polygon_cumulative[:, 1:] <= self.polygon_s[:, None]).sum(axis=1),
+                             self.polygon_vertices - 1)
+        offset = self.polygon_s - self.polygon_cumulative[self.polygon_rows, segment]
+        seg_delta = self.polygon_delta[self.polygon_rows, segment]
+        seg_length = np.hypot(seg_delta[:, 0], seg_delta[:, 1])
+        t = np.where(seg_length > 0, offset / np.where(seg_length > 0, seg_length, 1.0), 0.0)
+        return self.polygon_start[self.polygon_rows, segment] + seg_delta * t[:, None]
+
+    def positions(self, dt):
+        # Advance every obstacle by dt seconds and return the (x, y) of the published obstacles
+        return np.concatenate([self.step_linear(dt)[self.linear_valid], self.step_elliptical(dt),
+                               self.step_polygon(dt)[self.polygon_valid]])
+
+    def step(self, dt):
+        # Advance every obstacle by dt seconds, returning the names and (x, y, z) poses to publish
+        return self.names, np.column_stack([self.positions(dt), self.z]).tolist()
+
+
+class TrajectoryPlayer:
+    def __init__(self, path, shard=0, shards=1, loop=False):
+        # Replays a trajectory written by precompute_trajectory; the positions stay memory-mapped
+        # and each tick only indexes one row of the buffer. At the end of the recording the obstacles
+        # hold their last pose, or with loop start over from the first one.
+        self.meta = read_trajectory_meta(path)
+        self.positions_map = np.load(path, mmap_mode="r")
+        columns = np.arange(len(self.meta["names"]))
+        if shards > 1:
+            columns = np.array([i for i, name in enumerate(self.meta["names"]) if shard_of(name, shards) == shard],
+                               dtype=int)
+        self.columns = columns if len(columns) < len(self.meta["names"]) else slice(None)
+        self.names = [self.meta["names"][i] for i in columns]
+        self.z = np.asarray(self.meta["z"], dtype=float)[columns]
+        self.loop = loop
+        self.tick = 0
+        self.fixed_step = True
+
+    def __len__(self):
+        return len(self.names)
+
+    def positions(self, dt):
+        # Next recorded (x, y) of every obstacle
+        ticks = len(self.positions_map)
+        row = self.positions_map[self.tick % ticks if self.loop else min(self.tick, ticks - 1)]
+        self.tick += 1
+        return row[self.columns]
+
+    def step(self, dt):
+        # Return the names and (x, y, z) poses of the next recorded tick
+        return self.names, np.column_stack([self.positions(dt), self.z]).tolist()
+
+
+def trajectory_meta_path(path):
+    # Metadata (names, heights, rate, world) is kept in a JSON file next to the .npy buffer
+    return os.path.splitext(path)[0] + ".json"
+
+
+def read_trajectory_meta(path):
+    # Read the metadata of a precomputed trajectory
+    with open(trajectory_meta_path(path), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def precompute_trajectory(scenario_path, out_path, duration, rate_hz=None):
+    # Step the scenario at a fixed rate for duration seconds and store the (x, y) of every
+    # published obstacle per tick as a float32 (ticks, obstacles, 2) .npy file.
+    # Both files are replaced atomically, so a runtime playing the old trajectory keeps working.
+    scenario = read_scenario(scenario_path)
+    rate_hz = rate_hz or scenario["rate"]
+    engine = MotionEngine(scenario["obstacles"], scenario.get("seed"))
+    ticks = max(1, int(round(duration * rate_hz)))
+    directory = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".npy", dir=directory)
+    os.close(fd)
+    try:
+        buffer = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(ticks, len(engine), 2))
+        period = 1.0 / rate_hz
+        for tick in range(ticks):
+            buffer[tick] = engine.positions(period)
+        buffer.flush()
+        del buffer
+        os.chmod(tmp_path, 0o644)
+        meta = {"version": scenario["version"], "world": scenario["world"], "rate": rate_hz,
+                "seed": scenario.get("seed"), "names": engine.names, "z": engine.z.tolist()}
+        write_scenario(trajectory_meta_path(out_path), meta)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    return ticks
+
+
+def shard_of(name, shards):
+    # Stable shard of an obstacle, so it stays on the same worker (and keeps its phase) across reloads
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+class MotionRuntime:
+    def __init__(self, scenario_path, rate_hz=None, transport=None, shard=0, shards=1, stats_queue=None,
+                 stop_event=None, loop=False):
+        # Runs the motion loop for a scenario file (or one shard of it) and reloads it when the file changes.
+        # Each tick sends all poses through the transport's set_poses (one set_pose_vector request, or on
+        # Fortress one `ign service` process per request batch); without a transport one is created
+        # for the scenario's Gazebo version.
+        # Sharded workers send their timing stats to stats_queue instead of printing them.
+        # loop only applies to precomputed trajectories, which then restart instead of ending.
+        self.scenario_path = scenario_path
+        self.rate_override = rate_hz
+        self.loop = loop
+        self.transport = transport
+        self.world_name = None
+        self.shard = shard
+        self.shards = shards
+        self.stats_queue = stats_queue
+        self.stop_event = stop_event
+        self.engine = None
+        self.rate_hz = None
+        self.mtime_ns = None
+        self.reload_interval = 0.1
+        self.report_interval = 5.0
+        # Longest stretch of time one tick catches up on; only a suspended or stopped process
+        # should hit it, and the time cut off is reported as dropped
+        self.max_catch_up = 1.0
+        self.load()
+
+    def load(self):
+        # (Re)build the engine from the scenario file, or open a precomputed .npy trajectory for playback
+        stat = os.stat(self.scenario_path)
+        if self.scenario_path.endswith(".npy"):
+            engine = TrajectoryPlayer(self.scenario_path, self.shard, self.shards, self.loop)
+            self.mtime_ns = stat.st_mtime_ns
+            self.world_name = engine.meta["world"]
+            if self.transport is None:
+                self.transport = create_transport(engine.meta["version"])
+            # The recording is sampled at a fixed rate, which playback has to keep
+            self.rate_hz = engine.meta["rate"]
+            if self.engine is not None:
+                engine.tick = self.engine.tick
+                print(f"motion{self._label()}: reloaded {self.scenario_path}", file=sys.stderr, flush=True)
+            self.engine = engine
+            return
+
+        scenario = read_scenario(self.scenario_path)
+        self.mtime_ns = stat.st_mtime_ns
+        self.world_name = scenario["world"]
+        if self.transport is None:
+            self.transport = create_transport(scenario["version"])
+        self.rate_hz = self.rate_override or scenario["rate"]
+        obstacles = scenario["obstacles"]
+        if self.shards > 1:
+            obstacles = [o for o in obstacles if shard_of(o["name"], self.shards) == self.shard]
+        engine = MotionEngine(obstacles, scenario.get("seed"))
+        if self.engine is not None:
+            # Obstacles whose motion did not change keep moving from where they are
+            old_specs = self.engine.specs
+            unchanged = {name for name, spec in engine.specs.items() if old_specs.get(name) == spec}
+            phases = self.engine.phases()
+            engine.restore_phases({name: phases[name] for name in unchanged})
+            added = sum(1 for name in engine.specs if name not in old_specs)
+            removed = sum(1 for name in old_specs if name not in engine.specs)
+            changed = len(engine.specs) - len(unchanged) - added
+            print(f"motion{self._label()}: reloaded {self.scenario_path}: {added} added, {changed} changed, "
+                  f"{removed} removed", file=sys.stderr, flush=True)
+        self.engine = engine
+
+    def _label(self):
+        # Shard suffix for log lines
+        return f"[{self.shard}/{self.shards}]" if self.shards > 1 else ""
+
+    def reload_if_changed(self):
+        # Pick up a rewritten scenario file; a file that cannot be read keeps the current motion
+        try:
+            if os.stat(self.scenario_path).st_mtime_ns == self.mtime_ns:
+                return False
+            self.load()
+        except (OSError, ValueError) as e:
+            print(f"motion{self._label()}: could not reload {self.scenario_path}: {e}", file=sys.stderr, flush=True)
+            return False
+        return True
+
+    def run(self):
+        # Fixed-rate loop: positions advance by the measured elapsed time, so speeds stay
+        # correct when a tick overruns; missed deadlines are dropped rather than replayed.
+        # Seeded scenarios advance in whole ticks instead (catching up on every missed one), so the
+        # same seed and rate give the same trajectory regardless of timing jitter.
+        # Either way at most max_catch_up seconds are made up in one tick.
+        period = 1.0 / self.rate_hz
+        last = time.monotonic()
+        next_tick = last + period
+        report_at = last + self.report_interval
+        reload_at = last + self.reload_interval
+        ticks = overruns = missed = 0
+        busy = dropped = 0.0
+        steps = 1
+        while self.stop_event is None or not self.stop_event.is_set():
+            now = time.monotonic()
+            if not self.engine.fixed_step:
+                elapsed = now - last
+                last = now
+                if elapsed > self.max_catch_up:
+                    dropped += elapsed - self.max_catch_up
+                    elapsed = self.max_catch_up
+                names, poses = self.engine.step(elapsed)
+            else:
+                for _ in range(steps - 1):
+                    self.engine.step(period)
+                names, poses = self.engine.step(period)
+            if names and not self.transport.set_poses(self.world_name, names, poses):
+                return 1
+            ticks += 1
+            busy += time.monotonic() - now
+            now = time.monotonic()
+            if now >= next_tick:
+                overruns += 1
+                skipped = int((now - next_tick) / period)
+                missed += skipped
+                next_tick += (skipped + 1) * period
+                steps = skipped + 1
+                max_steps = max(1, int(self.max_catch_up / period))
+                if steps > max_steps:
+                    dropped += (steps - max_steps) * period
+                    steps = max_steps
+            else:
+                time.sleep(next_tick - now)
+                next_tick += period
+                steps = 1
+            if now >= reload_at:
+                if self.reload_if_changed():
+                    period = 1.0 / self.rate_hz
+                reload_at = now + self.reload_interval
+            if now >= report_at:
+                window = now - report_at + self.report_interval
+                if self.stats_queue is not None:
+                    self.stats_queue.put({"shard": self.shard, "obstacles": len(self.engine), "rate": ticks / window,
+                                          "overruns": overruns, "missed": missed, "busy": busy / window,
+                                          "dropped": dropped})
+                elif overruns:
+                    print(f"motion: {ticks / window:.1f} Hz of {self.rate_hz:.1f} Hz target, {overruns} overruns, "
+                          f"{missed} missed deadlines, {dropped:.2f} s of motion dropped", file=sys.stderr, flush=True)
+                report_at = now + self.report_interval
+                ticks = overruns = missed = 0
+                busy = dropped = 0.0
+        return 0
+
+
+def run_shard(scenario_path, rate_hz, shard, shards, stats_queue, stop_event, loop=False):
+    # Worker process body: drive one shard until the coordinator sets stop_event.
+    # Ctrl+C reaches the whole process group; only the coordinator reacts to it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.exit(MotionRuntime(scenario_path, rate_hz, shard=shard, shards=shards, stats_queue=stats_queue,
+                           stop_event=stop_event, loop=loop).run())
+
+
+class MotionCoordinator:
+    def __init__(self, scenario_path, rate_hz=None, workers=2, loop=False):
+        # Splits the scenario's obstacles across worker processes, each with its own transport,
+        # and combines their timing stats
+        self.scenario_path = scenario_path
+        self.rate_hz = rate_hz
+        self.workers = workers
+        self.loop = loop
+        self.stats_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+        self.report_interval = 5.0
+
+    def start(self):
+        # Launch one worker per shard
+        for shard in range(self.workers):
+            process = multiprocessing.Process(target=run_shard, name=f"motion-shard-{shard}", daemon=True,
+                                              args=(self.scenario_path, self.rate_hz, shard, self.workers,
+                                                    self.stats_queue, self.stop_event, self.loop))
+            process.start()
+            self.processes.append(process)
+
+    def stop(self, timeout=2.0):
+        # Ask the workers to finish their current tick, then terminate any that do not
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    def _terminate(self, signum, frame):
+        # Treat SIGTERM like Ctrl+C so the workers are always stopped; repeated signals are ignored
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    def combine(self, stats):
+        # Summarize the latest stats of every shard on one line
+        rates = [s["rate"] for s in stats.values()]
+        return (f"motion: {len(stats)}/{self.workers} shards, {sum(s['obstacles'] for s in stats.values())} obstacles, "
+                f"{sum(rates) / len(rates):.1f} Hz avg ({min(rates):.1f} min), "
+                f"{sum(s['overruns'] for s in stats.values())} overruns, "
+                f"{sum(s['missed'] for s in stats.values())} missed deadlines, "
+                f"{sum(s['dropped'] for s in stats.values()):.2f} s of motion dropped, "
+                f"busiest shard {max(s['busy'] for s in stats.values()) * 100:.0f}%")
+
+    def run(self):
+        # Start the workers and report combined stats until interrupted, terminated or a worker fails
+        self.start()
+        signal.signal(signal.SIGTERM, self._terminate)
+        stats = {}
+        report_at = time.monotonic() + self.report_interval
+        try:
+            while True:
+                try:
+                    shard_stats = self.stats_queue.get(timeout=0.5)
+                    stats[shard_stats["shard"]] = shard_stats
+                except queue.Empty:
+                    pass
+                failed = [p for p in self.processes if p.exitcode not in (None, 0)]
+                if failed:
+                    print(f"motion: {failed[0].name} exited with code {failed[0].exitcode}", file=sys.stderr, flush=True)
+                    return 1
+                # Wait for every shard's window, but do not let a stalled shard hide the others
+                if stats and time.monotonic() >= report_at and (len(stats) == self.workers or
+                                                                time.monotonic() >= report_at + self.report_interval):
+                    print(self.combine(stats), file=sys.stderr, flush=True)
+                    stats = {}
+                    report_at = time.monotonic() + self.report_interval
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            self.stop()
+
+
+def main(argv=None):
+    # Command line entry point: run the motion loop for a scenario file until interrupted
+    parser = argparse.ArgumentParser(description="Move the dynamic obstacles of a Gazebo world.")
+    parser.add_argument("scenario", help="motion scenario file written by the wizard (JSON), "
+                                         "or a precomputed trajectory (.npy) to play back")
+    parser.add_argument("--rate", type=float, default=None, help="update rate in Hz (default: from the scenario)")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes sharing the obstacles")
+    parser.add_argument("--precompute", metavar="OUT.npy", help="write the trajectory to OUT.npy instead of running")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to precompute (default: 60)")
+    parser.add_argument("--loop", action="store_true",
+                        help="restart a played back trajectory at its end instead of holding the last poses")
+    args = parser.parse_args(argv)
+    if args.precompute:
+        ticks = precompute_trajectory(args.scenario, args.precompute, args.duration, args.rate)
+        print(f"motion: wrote {ticks} ticks to {args.precompute}", file=sys.stderr)
+        return 0
+    if args.workers > 1:
+        return MotionCoordinator(args.scenario, args.rate, args.workers, args.loop).run()
+    try:
+        return MotionRuntime(args.scenario, args.rate, loop=args.loop).run()
+    except KeyboardInterrupt:
+        return 0
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+
+SCENARIO_VERSION = 1
+
+
+def scenario_from_models(version, world_name, models, rate_hz, seed=None):
+    # Build the scenario dict the motion runtime reads from the dynamic obstacle models.
+    # The seed is per world; a None seed gives unseeded, non-repeatable noise.
+    obstacles = []
+    for model in models:
+        props = model["properties"]
+        x, y, z = props["position"]
+        motion = {key: value for key, value in props["motion"].items() if key != "seed"}
+        obstacles.append({"name": model["name"], "center": [x, y], "z": z, "motion": motion})
+    return {
+        "format": SCENARIO_VERSION,
+        "version": version,
+        "world": world_name,
+        "rate": rate_hz,
+        "seed": seed,
+        "obstacles": obstacles
+    }
+
+
+def write_scenario(path, scenario):
+    # Write the scenario atomically so a running runtime never reads a half-written file
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".json.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(scenario, f, separators=(",", ":"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_scenario(path):
+    # Read a scenario file written by write_scenario
+    with open(path, encoding="utf-8") as f:
+        scenario = json.load(f)
+    if scenario.get("format") != SCENARIO_VERSION:
+        raise ValueError(f"Unsupported motion scenario format in {path}")
+    return scenario
@@ -18,6 +18,8 @@ class DynamicObstaclesPage(QWizardPage):
         self.velocity_input.setPlaceholderText("Velocity (m/s)")
         self.std_input = QLineEdit()
         self.std_input.setPlaceholderText("Std of randomness in velocity")
+        self.seed_input = QLineEdit()
+        self.seed_input.setPlaceholderText("Seed of the randomness (empty: unseeded)")
         self.semi_major_input = QLineEdit()
         self.semi_major_input.setPlaceholderText("Semi-major axis for Elliptical")
         self.semi_major_input.setEnabled(False)
@@ -39,6 +41,7 @@ class DynamicObstaclesPage(QWizardPage):
         left_layout.addWidget(self.obstacle_list)
         left_layout.addWidget(self.velocity_input)
         left_layout.addWidget(self.std_input)
+        left_layout.addWidget(self.seed_input)
         left_layout.addWidget(self.semi_major_input)
         left_layout.addWidget(self.semi_minor_input)
         left_layout.addWidget(self.start_button)
@@ -82,11 +85,10 @@ class DynamicObstaclesPage(QWizardPage):
         if not self.world_manager:
             QMessageBox.warning(self, "Error", "Please select a simulation platform and create/load a world first.")
             return
+        self.seed_input.setText("" if self.world_manager.motion_seed is None else str(self.world_manager.motion_seed))
         self.obstacle_list.clear()
-        for model in self.world_manager.models:
-            if model["type"] in ["box", "cylinder", "sphere"]:
-                self.obstacle_list.addItem(model["name"])
-        self.wizard().refresh_canvas(self.scene)
+        for model in self.world_manager.models.of_type("box", "cylinder", "sphere"):
+            self.obstacle_list.addItem(model["name"])
 
     def update_motion_type(self, text):
         # Update motion type and input field states
@@ -99,7 +101,7 @@ class DynamicObstaclesPage(QWizardPage):
     def select_obstacle(self, item):
         # Load selected obstacle's motion properties
         self.current_obstacle = item.text()
-        model = next((m for m in self.world_manager.models if m["name"] == self.current_obstacle), None)
+        model = self.world_manager.models.get(self.current_obstacle)
         if model and "motion" in model["properties"]:
             motion = model["properties"]["motion"]
             self.motion_type_combo.blockSignals(True)
@@ -143,7 +145,15 @@ class DynamicObstaclesPage(QWizardPage):
         self.store_motion()
 
     def eventFilter(self, obj, event):
-        # Handle mouse clicks to define motion path points
+        # Handle mouse clicks to define motion path points (left) and select obstacles (right)
+        if obj == self.view and event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton and self.world_manager:
+            obstacle_name = self.wizard().model_at(self.view, event.pos(), ("box", "cylinder", "sphere"))
+            if obstacle_name and not self.clicking_enabled:
+                items = self.obstacle_list.findItems(obstacle_name, Qt.MatchExactly)
+                if items:
+                    self.obstacle_list.setCurrentItem(items[0])
+                    self.select_obstacle(items[0])
+            return True
         if obj == self.view and event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton and self.clicking_enabled:
             clicked_point = self.view.mapToScene(event.pos())
             point = self.snap_to_grid(clicked_point)
@@ -191,7 +201,7 @@ class DynamicObstaclesPage(QWizardPage):
             except ValueError:
                 QMessageBox.warning(self, "Invalid Input", "Please enter valid semi-major and semi-minor axes.")
                 return
-            model = next(m for m in self.world_manager.models if m["name"] == self.current_obstacle)
+            model = self.world_manager.models.get(self.current_obstacle)
             center_m = model["properties"]["position"][:2]
             center = QPointF(center_m[0] * 100, -center_m[1] * 100)
             direction = self.points[0] - center
@@ -239,7 +249,7 @@ class DynamicObstaclesPage(QWizardPage):
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Input", f"Please enter valid velocity and std: {str(e)}")
             return
-        model = next(m for m in self.world_manager.models if m["name"] == self.current_obstacle)
+        model = self.world_manager.models.get(self.current_obstacle)
         motion = {"type": self.current_motion_type, "velocity": velocity, "std": std}
         if self.current_motion_type in ["linear", "polygon"]:
             path_m = [(p.x() / 100, -p.y() / 100) for p in self.points]
@@ -254,18 +264,43 @@ class DynamicObstaclesPage(QWizardPage):
             motion["semi_major"] = semi_major
             motion["semi_minor"] = semi_minor
             motion["angle"] = angle
-        model["properties"]["motion"] = motion
-        model["status"] = "updated" if model.get("status") else "new"
+        # Stored models are records; store the change by adding the updated model
+        self.world_manager.add_model({
+            "name": model["name"],
+            "type": model["type"],
+            "properties": dict(model["properties"], motion=motion),
+            "status": "new" if model["status"] == "new" else "updated"
+        })
 
     def apply_changes(self):
-        # Apply changes to the world and refresh canvas
+        # Check for collisions, apply changes to the world and restore the stored path of the obstacle being edited
         if not self.world_manager:
             QMessageBox.warning(self, "Error", "Please select a simulation platform and create/load a world first.")
             return
         try:
-            self.world_manager.apply_changes()
-            self.wizard().refresh_canvas(self.scene)
-            QMessageBox.information(self, "Success", "Changes applied successfully.")
+            seed = int(self.seed_input.text()) if self.seed_input.text().strip() else None
+            if seed is not None and seed < 0:
+                raise ValueError("Seed must be non-negative.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", f"Please enter a valid seed: {str(e)}")
+            return
+        if not self.wizard().confirm_apply(self):
+            return
+        try:
+            # The seed is stored in every <motion> block, so a changed seed rewrites the world file too
+            seed_changed = seed != self.world_manager.motion_seed
+            self.world_manager.motion_seed = seed
+            results = self.world_manager.apply_changes()
+            if seed_changed:
+                self.world_manager.save_sdf(self.world_manager.world_path)
+            model = self.world_manager.models.get(self.current_obstacle) if self.current_obstacle else None
+            if model:
+                self.wizard().model_changed("changed", model)
+            failed = [name for name, success in results.items() if not success]
+            if failed:
+                QMessageBox.warning(self, "Partial Success", f"Failed to apply changes for: {', '.join(failed)}")
+            else:
+                QMessageBox.information(self, "Success", "Changes applied successfully.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to apply changes: {str(e)}")
 
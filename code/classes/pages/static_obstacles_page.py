@@ -83,12 +83,10 @@ class StaticObstaclesPage(QWizardPage):
         self.refresh_obstacles()
 
     def refresh_obstacles(self):
-        # Update obstacle list and canvas
+        # Update obstacle list; the wizard keeps the canvas in sync with the models
         self.obstacle_list.clear()
-        self.wizard().refresh_canvas(self.scene)
-        for model in self.world_manager.models:
-            if model["type"] in ["box", "cylinder", "sphere"]:
-                self.obstacle_list.addItem(model["name"])
+        for model in self.world_manager.models.of_type("box", "cylinder", "sphere"):
+            self.obstacle_list.addItem(model["name"])
 
     def update_input_fields(self):
         # Enable/disable input fields based on obstacle type
@@ -116,7 +114,14 @@ class StaticObstaclesPage(QWizardPage):
         return QPointF(x, y)
 
     def eventFilter(self, obj, event):
-        # Handle mouse clicks to add obstacles
+        # Handle mouse clicks to add obstacles (left) and select them (right)
+        if obj == self.view and event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton and self.world_manager:
+            obstacle_name = self.wizard().model_at(self.view, event.pos(), ("box", "cylinder", "sphere"))
+            if obstacle_name:
+                items = self.obstacle_list.findItems(obstacle_name, Qt.MatchExactly)
+                if items:
+                    self.obstacle_list.setCurrentItem(items[0])
+            return True
         if obj == self.view and event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton and self.world_manager:
             clicked_point = self.view.mapToScene(event.pos())
             center = self.snap_to_grid(clicked_point)
@@ -138,7 +143,7 @@ class StaticObstaclesPage(QWizardPage):
                     size_m = (R,)
                     position_z = R
                 color = self.color_input.text() or "Gray"
-                obstacle_name = f"{obstacle_type}_{len(self.world_manager.models) + 1}"
+                obstacle_name = self.world_manager.next_model_name(obstacle_type)
                 x_m = center.x() / 100
                 y_m = -center.y() / 100
                 obstacle = {
@@ -153,7 +158,6 @@ class StaticObstaclesPage(QWizardPage):
                 }
                 self.world_manager.add_model(obstacle)
                 self.obstacle_list.addItem(obstacle_name)
-                self.wizard().refresh_canvas(self.scene)
             except ValueError:
                 QMessageBox.warning(self, "Invalid Input", "Please enter valid numeric values for dimensions.")
             return True
@@ -167,30 +171,23 @@ class StaticObstaclesPage(QWizardPage):
         selected = self.obstacle_list.currentItem()
         if selected:
             obstacle_name = selected.text()
-            if obstacle_name in self.wizard().obstacle_items:
-                item, text = self.wizard().obstacle_items[obstacle_name]
-                self.scene.removeItem(item)
-                self.scene.removeItem(text)
-                del self.wizard().obstacle_items[obstacle_name]
-            if obstacle_name in self.wizard().path_items:
-                for path_item in self.wizard().path_items[obstacle_name]:
-                    self.scene.removeItem(path_item)
-                del self.wizard().path_items[obstacle_name]
-            for model in self.world_manager.models:
-                if model["name"] == obstacle_name:
-                    model["status"] = "removed"
-                    break
+            self.world_manager.remove_model(obstacle_name)
             self.obstacle_list.takeItem(self.obstacle_list.row(selected))
 
     def apply_changes(self):
-        # Apply changes to the world and refresh canvas
+        # Check for collisions, then apply changes to the world
         if not self.world_manager:
             QMessageBox.warning(self, "Error", "Please select a simulation platform and create/load a world first.")
             return
+        if not self.wizard().confirm_apply(self):
+            return
         try:
-            self.world_manager.apply_changes()
-            self.wizard().refresh_canvas(self.scene)
-            QMessageBox.information(self, "Success", "Changes applied successfully.")
+            results = self.world_manager.apply_changes()
+            failed = [name for name, success in results.items() if not success]
+            if failed:
+                QMessageBox.warning(self, "Partial Success", f"Failed to apply changes for: {', '.join(failed)}")
+            else:
+                QMessageBox.information(self, "Success", "Changes applied successfully.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to apply changes: {str(e)}")
 
@@ -1,4 +1,4 @@
-from PyQt5.QtWidgets import QWizardPage, QHBoxLayout, QVBoxLayout, QPushButton, QLineEdit, QListWidget, QMessageBox, QWidget
+from PyQt5.QtWidgets import QWizardPage, QHBoxLayout, QVBoxLayout, QPushButton, QLineEdit, QListWidget, QMessageBox, QWidget, QProgressDialog
 from PyQt5.QtCore import Qt, QEvent, QPointF
 from PyQt5.QtGui import QColor
 from classes.zoomable_graphics_view import ZoomableGraphicsView
@@ -87,8 +87,16 @@ class WallsDesignPage(QWizardPage):
         return QPointF(x, y)
 
     def eventFilter(self, obj, event):
-        # Handle mouse clicks to add walls
+        # Handle mouse clicks to add walls (left) and select them (right)
         if obj == self.view and self.world_manager:
+            if event.type() == QEvent.MouseButtonPress and event.button() == Qt.RightButton:
+                # Right click selects the wall under the cursor
+                wall_name = self.wizard().model_at(self.view, event.pos(), ("wall",))
+                if wall_name:
+                    items = self.wall_list.findItems(wall_name, Qt.MatchExactly)
+                    if items:
+                        self.wall_list.setCurrentItem(items[0])
+                return True
             if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
                 if not hasattr(self, 'start_point'):
                     clicked_point = self.view.mapToScene(event.pos())
@@ -96,7 +104,7 @@ class WallsDesignPage(QWizardPage):
                 else:
                     clicked_point = self.view.mapToScene(event.pos())
                     end_point = self.snap_to_grid(clicked_point)
-                    wall_name = f"wall_{len(self.world_manager.models) + 1}"
+                    wall_name = self.world_manager.next_model_name("wall")
                     wall = {
                         "name": wall_name,
                         "type": "wall",
@@ -111,7 +119,6 @@ class WallsDesignPage(QWizardPage):
                     }
                     self.world_manager.add_model(wall)
                     self.wall_list.addItem(wall_name)
-                    self.wizard().refresh_canvas(self.scene)
                     del self.start_point
                 return True
         return super().eventFilter(obj, event)
@@ -141,7 +148,6 @@ class WallsDesignPage(QWizardPage):
             tree.write(new_world_path, encoding="utf-8", xml_declaration=True)
             self.world_manager.load_world(world_name)
             self.wall_list.clear()
-            self.wizard().refresh_canvas(self.scene)
             QMessageBox.information(self, "Success", f"Created and loaded new world: {world_name}")
             self.completeChanged.emit()
         except Exception as e:
@@ -156,18 +162,22 @@ class WallsDesignPage(QWizardPage):
         if not world_name:
             QMessageBox.warning(self, "Error", "Please enter a valid world name.")
             return
+        progress = QProgressDialog(f"Loading world: {world_name}", None, 0, 100, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
         try:
-            self.world_manager.load_world(world_name)
+            self.world_manager.load_world(world_name, progress=lambda done, total: progress.setValue(int(100 * done / max(total, 1))))
+            progress.close()
             self.wall_list.clear()
-            self.wizard().refresh_canvas(self.scene)
-            for model in self.world_manager.models:
-                if model["type"] == "wall":
-                    self.wall_list.addItem(model["name"])
+            for model in self.world_manager.models.of_type("wall"):
+                self.wall_list.addItem(model["name"])
             QMessageBox.information(self, "Success", f"Loaded world: {world_name}")
             self.completeChanged.emit()
         except FileNotFoundError as e:
+            progress.close()
             QMessageBox.critical(self, "Error", str(e))
         except Exception as e:
+            progress.close()
             QMessageBox.critical(self, "Error", f"Failed to load world: {str(e)}")
 
     def remove_selected_wall(self):
@@ -178,26 +188,23 @@ class WallsDesignPage(QWizardPage):
         selected = self.wall_list.currentItem()
         if selected:
             wall_name = selected.text()
-            if wall_name in self.wizard().wall_items:
-                line, text = self.wizard().wall_items[wall_name]
-                self.scene.removeItem(line)
-                self.scene.removeItem(text)
-                del self.wizard().wall_items[wall_name]
-            for model in self.world_manager.models:
-                if model["name"] == wall_name:
-                    model["status"] = "removed"
-                    break
+            self.world_manager.remove_model(wall_name)
             self.wall_list.takeItem(self.wall_list.row(selected))
 
     def apply_changes(self):
-        # Apply changes to the world and refresh canvas
+        # Check for collisions, then apply changes to the world
         if not self.world_manager:
             QMessageBox.warning(self, "Error", "Please select a simulation platform first.")
             return
+        if not self.wizard().confirm_apply(self):
+            return
         try:
-            self.world_manager.apply_changes()
-            self.wizard().refresh_canvas(self.scene)
-            QMessageBox.information(self, "Success", "Changes applied successfully.")
+            results = self.world_manager.apply_changes()
+            failed = [name for name, success in results.items() if not success]
+            if failed:
+                QMessageBox.warning(self, "Partial Success", f"Failed to apply changes for: {', '.join(failed)}")
+            else:
+                QMessageBox.information(self, "Success", "Changes applied successfully.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to apply changes: {str(e)}")
 
@@ -0,0 +1,257 @@
+import math
+
+from classes.model_records import Box, Obstacle, Wall, as_record
+
+
+def model_footprint(record):
+    # Axis-aligned bounding box (min_x, min_y, max_x, max_y) of a wall's or obstacle's ground footprint in meters
+    if isinstance(record, Wall):
+        half_width = record.width / 2
+        x0, y0, x1, y1 = record.start_x, record.start_y, record.end_x, record.end_y
+        return (min(x0, x1) - half_width, min(y0, y1) - half_width,
+                max(x0, x1) + half_width, max(y0, y1) + half_width)
+    x, y = record.x, record.y
+    if isinstance(record, Box):
+        half_x, half_y = record.width / 2, record.length / 2
+    else:
+        half_x = half_y = record.radius
+    return (x - half_x, y - half_y, x + half_x, y + half_y)
+
+
+def segment_point_distance(x0, y0, x1, y1, px, py):
+    # Distance from point (px, py) to the segment (x0, y0)-(x1, y1)
+    dx, dy = x1 - x0, y1 - y0
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - x0) * dx + (py - y0) * dy) / length_sq))
+    return math.hypot(px - x0 - t * dx, py - y0 - t * dy)
+
+
+def rect_point_distance(min_x, min_y, max_x, max_y, px, py):
+    # Distance from point (px, py) to an axis-aligned rectangle, 0 inside it
+    return math.hypot(max(min_x - px, 0.0, px - max_x), max(min_y - py, 0.0, py - max_y))
+
+
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    # Whether segments a-b and c-d cross or touch
+    def orientation(px, py, qx, qy, rx, ry):
+        value = (qx - px) * (ry - py) - (qy - py) * (rx - px)
+        return (value > 0) - (value < 0)
+    o1, o2 = orientation(ax, ay, bx, by, cx, cy), orientation(ax, ay, bx, by, dx, dy)
+    o3, o4 = orientation(cx, cy, dx, dy, ax, ay), orientation(cx, cy, dx, dy, bx, by)
+    if o1 != o2 and o3 != o4:
+        return True
+    # Collinear cases: an end point lies on the other segment
+    return ((o1 == 0 and segment_point_distance(ax, ay, bx, by, cx, cy) == 0)
+            or (o2 == 0 and segment_point_distance(ax, ay, bx, by, dx, dy) == 0)
+            or (o3 == 0 and segment_point_distance(cx, cy, dx, dy, ax, ay) == 0)
+            or (o4 == 0 and segment_point_distance(cx, cy, dx, dy, bx, by) == 0))
+
+
+def segment_rect_distance(x0, y0, x1, y1, min_x, min_y, max_x, max_y):
+    # Distance between a segment and an axis-aligned rectangle, 0 if they touch
+    if (rect_point_distance(min_x, min_y, max_x, max_y, x0, y0) == 0
+            or rect_point_distance(min_x, min_y, max_x, max_y, x1, y1) == 0):
+        return 0.0
+    corners = [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+    for (cx, cy), (dx, dy) in zip(corners, corners[1:] + corners[:1]):
+        if segments_intersect(x0, y0, x1, y1, cx, cy, dx, dy):
+            return 0.0
+    return min([segment_point_distance(x0, y0, x1, y1, cx, cy) for cx, cy in corners]
+               + [rect_point_distance(min_x, min_y, max_x, max_y, x0, y0),
+                  rect_point_distance(min_x, min_y, max_x, max_y, x1, y1)])
+
+
+def model_point_distance(record, px, py):
+    # Distance from a point to a wall's or obstacle's footprint in meters, 0 inside it
+    if isinstance(record, Wall):
+        return max(segment_point_distance(record.start_x, record.start_y, record.end_x, record.end_y, px, py)
+                   - record.width / 2, 0.0)
+    if isinstance(record, Box):
+        return rect_point_distance(*model_footprint(record), px, py)
+    return max(math.hypot(px - record.x, py - record.y) - record.radius, 0.0)
+
+
+def model_rect_distance(record, min_x, min_y, max_x, max_y):
+    # Distance from an axis-aligned rectangle to a wall's or obstacle's footprint in meters, 0 if they overlap
+    if isinstance(record, Wall):
+        return max(segment_rect_distance(record.start_x, record.start_y, record.end_x, record.end_y,
+                                         min_x, min_y, max_x, max_y) - record.width / 2, 0.0)
+    if isinstance(record, Box):
+        bx0, by0, bx1, by1 = model_footprint(record)
+        return math.hypot(max(bx0 - max_x, 0.0, min_x - bx1), max(by0 - max_y, 0.0, min_y - by1))
+    return max(rect_point_distance(min_x, min_y, max_x, max_y, record.x, record.y) - record.radius, 0.0)
+
+
+def segment_cells(x0, y0, x1, y1, half_width, cell_size):
+    # Grid cells within half_width of a segment, walking it one cell column at a time along its
+    # longer axis, so a long diagonal wall covers a band of cells instead of its whole bounding box
+    swap = abs(y1 - y0) > abs(x1 - x0)
+    if swap:
+        x0, y0, x1, y1 = y0, x0, y1, x1
+    if x1 < x0:
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    slope = (y1 - y0) / (x1 - x0) if x1 > x0 else 0.0
+    cells = []
+    for i in range(math.floor((x0 - half_width) / cell_size), math.floor((x1 + half_width) / cell_size) + 1):
+        # Part of the segment within half_width of this column, then its y span widened by half_width
+        xa = max(i * cell_size - half_width, x0)
+        xb = min((i + 1) * cell_size + half_width, x1)
+        if xa > xb:
+            continue
+        ya, yb = y0 + (xa - x0) * slope, y0 + (xb - x0) * slope
+        for j in range(math.floor((min(ya, yb) - half_width) / cell_size),
+                       math.floor((max(ya, yb) + half_width) / cell_size) + 1):
+            cells.append((j, i) if swap else (i, j))
+    return cells
+
+
+class SpatialIndex:
+    def __init__(self, cell_size=1.0):
+        # Uniform grid over world meters: each cell holds the names of the models whose footprint may touch it
+        # (the footprint box for obstacles, the band of cells along the segment for walls)
+        self.cell_size = cell_size
+        self.cells = {}
+        self.models = {}
+        self.model_cells = {}
+        self.bounds = None
+
+    def __len__(self):
+        return len(self.models)
+
+    def __contains__(self, name):
+        return name in self.models
+
+    def cell_range(self, min_x, min_y, max_x, max_y):
+        # Grid cells covered by a box, as (i0, j0, i1, j1) inclusive
+        size = self.cell_size
+        return (math.floor(min_x / size), math.floor(min_y / size),
+                math.floor(max_x / size), math.floor(max_y / size))
+
+    def insert(self, model):
+        # Add a model (dict or record), replacing any earlier entry with the same name; the index keeps
+        # the typed record and only holds walls and obstacles
+        record = as_record(model)
+        name = record.name
+        if name in self.models:
+            self.remove(name)
+        if not isinstance(record, (Wall, Obstacle)):
+            return
+        i0, j0, i1, j1 = self.cell_range(*model_footprint(record))
+        if isinstance(record, Wall) and i1 - i0 > 1 and j1 - j0 > 1:
+            # A wall whose box spans several cells both ways only touches a band of them
+            keys = segment_cells(record.start_x, record.start_y, record.end_x, record.end_y, record.width / 2,
+                                 self.cell_size)
+        else:
+            keys = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        cells = self.cells
+        for key in keys:
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = {name}
+            else:
+                cell.add(name)
+        self.models[name] = record
+        self.model_cells[name] = keys
+        if self.bounds is None:
+            self.bounds = [i0, j0, i1, j1]
+        else:
+            self.bounds = [min(self.bounds[0], i0), min(self.bounds[1], j0),
+                           max(self.bounds[2], i1), max(self.bounds[3], j1)]
+
+    def remove(self, name):
+        # Drop a model from the index
+        self.models.pop(name, None)
+        for key in self.model_cells.pop(name, ()):
+            cell = self.cells[key]
+            cell.discard(name)
+            if not cell:
+                del self.cells[key]
+
+    def rebuild(self, models):
+        # Replace the index contents with the given models
+        self.cells.clear()
+        self.models.clear()
+        self.model_cells.clear()
+        self.bounds = None
+        for model in models:
+            if model.get("status") != "removed":
+                self.insert(model)
+
+    def candidates(self, min_x, min_y, max_x, max_y):
+        # Names of the models registered in the cells a box covers
+        i0, j0, i1, j1 = self.cell_range(min_x, min_y, max_x, max_y)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.cells):
+            # Boxes larger than the occupied grid are cheaper to answer from the occupied cells
+            return {name for (i, j), cell in self.cells.items() if i0 <= i <= i1 and j0 <= j <= j1 for name in cell}
+        names = set()
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                names.update(self.cells.get((i, j), ()))
+        return names
+
+    def pick(self, x, y, tolerance=0.0, types=None):
+        # Names of the models within tolerance meters of a point, closest first
+        hits = []
+        for name in self.candidates(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            model = self.models[name]
+            if types and model.model_type not in types:
+                continue
+            distance = model_point_distance(model, x, y)
+            if distance <= tolerance:
+                hits.append((distance, name))
+        return [name for _, name in sorted(hits)]
+
+    def box_select(self, min_x, min_y, max_x, max_y, types=None):
+        # Names of the models whose footprint overlaps a box
+        min_x, max_x = min(min_x, max_x), max(min_x, max_x)
+        min_y, max_y = min(min_y, max_y), max(min_y, max_y)
+        return [name for name in self.candidates(min_x, min_y, max_x, max_y)
+                if (not types or self.models[name].model_type in types)
+                and model_rect_distance(self.models[name], min_x, min_y, max_x, max_y) == 0]
+
+    def ring_keys(self, ci, cj, ring):
+        # Occupied-bounds part of the square ring of cells ring cells away from (ci, cj)
+        b0, b1, b2, b3 = self.bounds
+        if ring == 0:
+            return [(ci, cj)]
+        i0, i1 = max(ci - ring, b0), min(ci + ring, b2)
+        j0, j1 = max(cj - ring + 1, b1), min(cj + ring - 1, b3)
+        count = 2 * (i1 - i0 + 1) + 2 * (j1 - j0 + 1)
+        if count > len(self.cells):
+            # Rings longer than the occupied cells are cheaper to answer from the occupied cells
+            return [key for key in self.cells if max(abs(key[0] - ci), abs(key[1] - cj)) == ring]
+        keys = [(i, j) for j in (cj - ring, cj + ring) if b1 <= j <= b3 for i in range(i0, i1 + 1)]
+        keys += [(i, j) for i in (ci - ring, ci + ring) if b0 <= i <= b2 for j in range(j0, j1 + 1)]
+        return keys
+
+    def nearest(self, x, y, types=None, max_distance=math.inf):
+        # Name of the model closest to a point and its distance, searching rings of cells outwards;
+        # (None, inf) if nothing lies within max_distance
+        if self.bounds is None:
+            return None, math.inf
+        ci, cj = math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+        # Only rings that cross the occupied cells can hold anything, so a point far away from the
+        # world starts at the first ring reaching it and each ring is clipped to the occupied bounds
+        min_ring = max(self.bounds[0] - ci, ci - self.bounds[2], self.bounds[1] - cj, cj - self.bounds[3], 0)
+        max_ring = max(ci - self.bounds[0], self.bounds[2] - ci, cj - self.bounds[1], self.bounds[3] - cj, 0)
+        best_name, best_distance = None, math.inf
+        seen = set()
+        for ring in range(min_ring, max_ring + 1):
+            # Everything outside ring - 1 is at least (ring - 1) cells away from the point
+            reach = (ring - 1) * self.cell_size
+            if reach >= min(best_distance, max_distance):
+                break
+            for key in self.ring_keys(ci, cj, ring):
+                for name in self.cells.get(key, ()):
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    model = self.models[name]
+                    if types and model.model_type not in types:
+                        continue
+                    distance = model_point_distance(model, x, y)
+                    if distance < best_distance:
+                        best_name, best_distance = name, distance
+        if best_distance > max_distance:
+            return None, math.inf
+        return best_name, best_distance
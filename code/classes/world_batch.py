@@ -0,0 +1,150 @@
+import math
+import multiprocessing
+import os
+import random
+import string
+import sys
+import time
+from classes.world_builder import build_world
+
+DEFAULT_SIZES = {
+    "box": {"width": [0.2, 1.0], "length": [0.2, 1.0], "height": [0.5, 1.5]},
+    "cylinder": {"radius": [0.1, 0.5], "length": [0.5, 1.5]},
+    "sphere": {"radius": [0.1, 0.5]}
+}
+
+
+def sample(rng, value):
+    # Draw from a template value: a number is a constant, [low, high] is uniform
+    if isinstance(value, (list, tuple)):
+        return rng.uniform(value[0], value[1])
+    return value
+
+
+def sample_int(rng, value):
+    # Like sample, but [low, high] is an inclusive integer range
+    if isinstance(value, (list, tuple)):
+        return rng.randint(int(value[0]), int(value[1]))
+    return int(value)
+
+
+def choose(rng, weights):
+    # Pick a key of a {choice: weight} dict, or an item of a list with equal weights
+    if isinstance(weights, dict):
+        return rng.choices(list(weights), weights=list(weights.values()))[0]
+    return rng.choice(weights)
+
+
+def random_motion(rng, settings, x, y):
+    # Draw a motion around (x, y) from the template's motion distributions
+    motion_type = choose(rng, settings.get("types", ["linear", "elliptical", "polygon"]))
+    motion = {"type": motion_type, "velocity": sample(rng, settings.get("velocity", [0.2, 1.0])),
+              "std": sample(rng, settings.get("std", 0.0))}
+    extent = settings.get("extent", [0.5, 2.0])
+    if motion_type == "linear":
+        heading = rng.uniform(0, 2 * math.pi)
+        length = sample(rng, extent)
+        motion["path"] = [[x, y], [x + length * math.cos(heading), y + length * math.sin(heading)]]
+    elif motion_type == "elliptical":
+        semi_major = sample(rng, extent)
+        motion["semi_major"] = semi_major
+        motion["semi_minor"] = semi_major * sample(rng, settings.get("aspect", [0.3, 1.0]))
+        motion["angle"] = rng.uniform(0, math.pi)
+    else:
+        # Star-shaped polygon: sorted angles around the obstacle keep it simple (non-self-intersecting)
+        vertices = sample_int(rng, settings.get("vertices", [3, 6]))
+        angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(vertices))
+        motion["path"] = [[x + sample(rng, extent) * math.cos(a), y + sample(rng, extent) * math.sin(a)]
+                          for a in angles]
+    return motion
+
+
+def check_template(template):
+    # Reject a template whose name has no {seed} field, since every world of a batch would get the
+    # same name and overwrite the files of the others
+    name = template.get("name", "world_{seed}")
+    if not any(field == "seed" for _, field, _, _ in string.Formatter().parse(name)):
+        raise ValueError(f"Template name must contain {{seed}} to tell the worlds apart: {name}")
+
+
+def render_spec(template, seed):
+    # Turn a parameterized template into a concrete world spec; the same seed gives the same world
+    check_template(template)
+    rng = random.Random(seed)
+    spec = {key: value for key, value in template.items() if key not in ("arena", "random_obstacles")}
+    spec["name"] = template.get("name", "world_{seed}").format(seed=seed)
+    spec["walls"] = list(template.get("walls", []))
+    spec["obstacles"] = list(template.get("obstacles", []))
+    motion = dict(template.get("motion", {}))
+    if motion.get("seed") == "world":
+        # Use the world's seed for the velocity noise too
+        motion["seed"] = seed
+    spec["motion"] = motion
+
+    arena = template.get("arena")
+    if arena and arena.get("walls", True):
+        # Boundary walls around an arena centered on the origin
+        hx, hy = arena["size"][0] / 2, arena["size"][1] / 2
+        corners = [[-hx, -hy], [hx, -hy], [hx, hy], [-hx, hy]]
+        for start, end in zip(corners, corners[1:] + corners[:1]):
+            spec["walls"].append({"start": start, "end": end, "width": arena.get("width", 0.1),
+                                  "height": arena.get("height", 1.0), "color": arena.get("color", "Gray")})
+
+    settings = template.get("random_obstacles")
+    if settings:
+        if arena:
+            default_x = [-arena["size"][0] / 2, arena["size"][0] / 2]
+            default_y = [-arena["size"][1] / 2, arena["size"][1] / 2]
+        else:
+            default_x = default_y = [-5.0, 5.0]
+        position = settings.get("position", {})
+        sizes = settings.get("size", {})
+        for _ in range(sample_int(rng, settings.get("count", 10))):
+            obstacle_type = choose(rng, settings.get("types", ["box", "cylinder", "sphere"]))
+            size_ranges = {**DEFAULT_SIZES[obstacle_type], **sizes.get(obstacle_type, {})}
+            if obstacle_type == "box":
+                size = [sample(rng, size_ranges["width"]), sample(rng, size_ranges["length"]),
+                        sample(rng, size_ranges["height"])]
+            elif obstacle_type == "cylinder":
+                size = [sample(rng, size_ranges["radius"]), sample(rng, size_ranges["length"])]
+            else:
+                size = [sample(rng, size_ranges["radius"])]
+            x = sample(rng, position.get("x", default_x))
+            y = sample(rng, position.get("y", default_y))
+            obstacle = {"type": obstacle_type, "position": [x, y], "size": size,
+                        "color": choose(rng, settings.get("colors", ["Gray"]))}
+            if rng.random() < settings.get("dynamic_fraction", 0.0):
+                obstacle["motion"] = random_motion(rng, settings.get("motion", {}), x, y)
+            spec["obstacles"].append(obstacle)
+    return spec
+
+
+def render_world(template, seed, output_dir, version=None):
+    # Render and write one world variant, returning its path
+    return build_world(render_spec(template, seed), output_dir, version)
+
+
+def generate_batch(template, seeds, output_dir, version=None, jobs=None, report_every=100, out=sys.stderr):
+    # Render one world per seed across a process pool, yielding paths as worlds are written,
+    # and report the throughput in worlds per second
+    check_template(template)
+    seeds = list(seeds)
+    args = [(template, seed, output_dir, version) for seed in seeds]
+    start = time.perf_counter()
+    done = 0
+    jobs = jobs or os.cpu_count() or 1
+    # Small chunks keep the workers busy without holding many finished paths back
+    chunksize = max(1, len(args) // (jobs * 8))
+    with multiprocessing.Pool(jobs) as pool:
+        for path in pool.imap_unordered(_render_world_args, args, chunksize):
+            done += 1
+            if out and (done % report_every == 0 or done == len(args)):
+                elapsed = time.perf_counter() - start
+                print(f"batch: {done}/{len(args)} worlds in {elapsed:.1f} s ({done / elapsed:.1f} worlds/s)",
+                      file=out, flush=True)
+            yield path
+
+
+def _render_world_args(args):
+    # Pool helper: unpack the arguments of render_world
+    return render_world(*args)
@@ -0,0 +1,116 @@
+import json
+import multiprocessing
+import os
+from classes.world_manager import WorldManager
+
+OBSTACLE_TYPES = ("box", "cylinder", "sphere")
+MOTION_MODES = ("script", "playback")
+
+
+def load_spec(path):
+    # Read a world spec from a JSON or YAML file (YAML needs PyYAML)
+    with open(path, encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("PyYAML is required to read YAML specs: pip install pyyaml")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def motion_from_spec(entry):
+    # Normalize a motion entry of a spec into the motion dict used by WorldManager
+    motion_type = entry["type"]
+    motion = {"type": motion_type, "velocity": float(entry["velocity"]), "std": float(entry.get("std", 0.0))}
+    if motion_type in ("linear", "polygon"):
+        motion["path"] = [(float(x), float(y)) for x, y in entry["path"]]
+        if motion_type == "linear" and len(motion["path"]) != 2:
+            raise ValueError("A linear motion needs exactly 2 path points")
+        if motion_type == "polygon" and len(motion["path"]) < 3:
+            raise ValueError("A polygon motion needs at least 3 path points")
+    elif motion_type == "elliptical":
+        motion["semi_major"] = float(entry["semi_major"])
+        motion["semi_minor"] = float(entry["semi_minor"])
+        motion["angle"] = float(entry.get("angle", 0.0))
+    else:
+        raise ValueError(f"Unknown motion type: {motion_type}")
+    return motion
+
+
+def wall_from_spec(entry, name):
+    # Build a wall model dict from a spec entry
+    return {
+        "name": entry.get("name", name),
+        "type": "wall",
+        "properties": {
+            "start": tuple(float(v) for v in entry["start"]),
+            "end": tuple(float(v) for v in entry["end"]),
+            "width": float(entry.get("width", 0.1)),
+            "height": float(entry.get("height", 1.0)),
+            "color": entry.get("color", "Gray")
+        },
+        "status": ""
+    }
+
+
+def obstacle_from_spec(entry, name):
+    # Build an obstacle model dict from a spec entry; z defaults to resting on the ground like in the wizard
+    obstacle_type = entry["type"]
+    if obstacle_type not in OBSTACLE_TYPES:
+        raise ValueError(f"Unknown obstacle type: {obstacle_type}")
+    size = tuple(float(v) for v in entry["size"])
+    position = [float(v) for v in entry["position"]]
+    if len(position) == 2:
+        position.append(size[0] if obstacle_type == "sphere" else size[-1] / 2)
+    properties = {"position": tuple(position), "size": size, "color": entry.get("color", "Gray")}
+    if entry.get("motion"):
+        properties["motion"] = motion_from_spec(entry["motion"])
+    return {"name": entry.get("name", name), "type": obstacle_type, "properties": properties, "status": ""}
+
+
+def world_from_spec(spec, output_dir=None, version=None):
+    # Set up a WorldManager holding the models of a spec dict, without a GUI or simulator
+    version = version or spec.get("version", "harmonic")
+    world_manager = WorldManager("gazebo", version)
+    if output_dir:
+        world_manager.worlds_dir = output_dir
+    motion = spec.get("motion", {})
+    mode = motion.get("mode", world_manager.motion_mode)
+    if mode not in MOTION_MODES:
+        raise ValueError(f"Unknown motion.mode: {mode} (expected one of {', '.join(MOTION_MODES)})")
+    world_manager.motion_mode = mode
+    world_manager.motion_rate = float(motion.get("rate", world_manager.motion_rate))
+    world_manager.motion_workers = int(motion.get("workers", world_manager.motion_workers))
+    world_manager.motion_duration = float(motion.get("duration", world_manager.motion_duration))
+    world_manager.motion_loop = bool(motion.get("loop", world_manager.motion_loop))
+    world_manager.create_new_world(spec["name"], launch=False)
+    world_manager.motion_seed = motion.get("seed")
+
+    for entry in spec.get("walls", []):
+        world_manager.add_model(wall_from_spec(entry, world_manager.next_model_name("wall")))
+    for entry in spec.get("obstacles", []):
+        world_manager.add_model(obstacle_from_spec(entry, world_manager.next_model_name(entry["type"])))
+    return world_manager
+
+
+def build_world(spec, output_dir=None, version=None):
+    # Build a world from a spec dict and write its SDF and motion files without a GUI or simulator.
+    # Returns the path of the written world file.
+    world_manager = world_from_spec(spec, output_dir, version)
+    world_manager.save_world()
+    return world_manager.world_path
+
+
+def build_world_file(spec_path, output_dir=None, version=None):
+    # Build the world described by a spec file
+    return build_world(load_spec(spec_path), output_dir, version)
+
+
+def build_world_files(spec_paths, output_dir=None, version=None, jobs=None):
+    # Build several spec files, in parallel across a process pool when jobs > 1
+    args = [(path, output_dir, version) for path in spec_paths]
+    if jobs == 1 or len(args) <= 1:
+        return [build_world_file(*a) for a in args]
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.starmap(build_world_file, args)
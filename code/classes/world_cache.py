@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+import numpy as np
+
+# Header: magic, format version, SDF size, SDF mtime (ns), SHA-1 of the SDF contents
+CACHE_MAGIC = b"DWGC"
+# Version 2: only world-level models are stored (version 1 also held models nested in other models).
+# Version 3: data-only layout, nothing in the file is ever unpickled or executed
+CACHE_VERSION = 3
+HEADER = struct.Struct("<4sIqq20s")
+# Payload: length of the zlib-compressed JSON index, the index, then one little-endian float64 column
+# block per record type, rows in model order. The index holds the SDF skeleton, each model's name, type,
+# color and motion, and the properties of models that do not fit a column block.
+INDEX_LENGTH = struct.Struct("<I")
+COLUMN_DTYPE = np.dtype("<f8")
+# Numeric properties stored in the column blocks, per model type
+COLUMNS = {
+    "wall": ("start", "end", "width", "height"),
+    "box": ("position", "size"),
+    "cylinder": ("position", "size"),
+    "sphere": ("position", "size"),
+}
+COLUMN_WIDTHS = {"wall": 6, "box": 6, "cylinder": 5, "sphere": 4}
+
+
+def cache_path(sdf_path):
+    # Cache file for a world: <world dir>/.cache/<world>.bin
+    directory, filename = os.path.split(sdf_path)
+    return os.path.join(directory, ".cache", os.path.splitext(filename)[0] + ".bin")
+
+
+def file_digest(path):
+    # SHA-1 of a file's contents
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def column_values(model_type, properties):
+    # Flatten the numeric properties of a wizard model into one column row, or None if it has other fields
+    keys = COLUMNS.get(model_type)
+    if keys is None or set(properties) - {"motion", "color"} != set(keys):
+        return None
+    if not isinstance(properties.get("color"), str):
+        return None
+    values = []
+    for key in keys:
+        value = properties[key]
+        values.extend(value if isinstance(value, (tuple, list)) else (value,))
+    if len(values) != COLUMN_WIDTHS[model_type] or not all(isinstance(v, (int, float)) for v in values):
+        return None
+    return values
+
+
+def column_properties(model_type, values):
+    # Rebuild the numeric properties of a model from its column row
+    if model_type == "wall":
+        return {"start": (values[0], values[1]), "end": (values[2], values[3]), "width": values[4],
+                "height": values[5]}
+    return {"position": (values[0], values[1], values[2]), "size": tuple(values[3:])}
+
+
+def encode_cache(skeleton_xml, rows):
+    # Serialize the skeleton and model rows into the cache payload
+    models = []
+    other = {}
+    columns = {model_type: [] for model_type in COLUMNS}
+    for index, (name, model_type, properties) in enumerate(rows):
+        values = column_values(model_type, properties)
+        if values is None:
+            models.append([name, model_type, None, None])
+            other[str(index)] = properties
+        else:
+            models.append([name, model_type, properties["color"], properties.get("motion")])
+            columns[model_type].extend(values)
+    index = zlib.compress(json.dumps({
+        "skeleton": skeleton_xml.decode("utf-8"),
+        "models": models,
+        "other": other,
+    }).encode("utf-8"))
+    blocks = [np.asarray(columns[model_type], dtype=COLUMN_DTYPE).tobytes() for model_type in COLUMNS]
+    return b"".join([INDEX_LENGTH.pack(len(index)), index] + blocks)
+
+
+def decode_cache(payload):
+    # Parse a cache payload back into (skeleton_xml, rows); raises ValueError on malformed data
+    try:
+        (index_length,) = INDEX_LENGTH.unpack_from(payload)
+        index = json.loads(zlib.decompress(payload[INDEX_LENGTH.size:INDEX_LENGTH.size + index_length]))
+        models, other = index["models"], index["other"]
+        offset = INDEX_LENGTH.size + index_length
+        counts = dict.fromkeys(COLUMNS, 0)
+        for name, model_type, color, motion in models:
+            if color is not None:
+                counts[model_type] += 1
+        columns = {}
+        for model_type, count in counts.items():
+            size = count * COLUMN_WIDTHS[model_type]
+            block = np.frombuffer(payload, dtype=COLUMN_DTYPE, count=size, offset=offset)
+            columns[model_type] = iter(block.reshape(count, COLUMN_WIDTHS[model_type]).tolist())
+            offset += size * COLUMN_DTYPE.itemsize
+        if offset != len(payload):
+            raise ValueError("cache payload has trailing data")
+        rows = []
+        for i, (name, model_type, color, motion) in enumerate(models):
+            if color is None:
+                properties = other[str(i)]
+            else:
+                properties = column_properties(model_type, next(columns[model_type]))
+                properties["color"] = color
+                if motion is not None:
+                    properties["motion"] = motion
+            rows.append((name, model_type, properties))
+        return index["skeleton"].encode("utf-8"), rows
+    except (KeyError, TypeError, IndexError, StopIteration, struct.error, zlib.error) as e:
+        raise ValueError(f"malformed cache payload: {e}") from e
+
+
+def load_cache(sdf_path):
+    # Return (skeleton_xml, rows) if the cache matches the SDF file, else None.
+    # A size/mtime match is trusted directly; otherwise the content hash decides.
+    path = cache_path(sdf_path)
+    try:
+        stat = os.stat(sdf_path)
+        with open(path, "rb") as f:
+            magic, version, size, mtime_ns, digest = HEADER.unpack(f.read(HEADER.size))
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                return None
+            header_current = (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+            if not header_current and (size != stat.st_size or digest != file_digest(sdf_path)):
+                return None
+            payload = f.read()
+        cached = decode_cache(payload)
+    except (OSError, struct.error, ValueError):
+        return None
+    if not header_current:
+        # Same contents with a new mtime (e.g. a copy); rewrite the cache so the next load skips the hash
+        save_cache(sdf_path, stat, digest, *cached)
+    return cached
+
+
+def save_cache(sdf_path, stat, digest, skeleton_xml, rows):
+    # Write the parsed world next to the SDF file; stat and digest describe the parsed contents.
+    # Failures are ignored, they only cost the next load a full parse.
+    path = cache_path(sdf_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".bin.tmp", dir=os.path.dirname(path))
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(CACHE_MAGIC, CACHE_VERSION, stat.st_size, stat.st_mtime_ns, digest))
+            f.write(encode_cache(skeleton_xml, rows))
+        # mkstemp creates the file 0600, which would hide the cache from other users of the worlds directory
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        os.unlink(tmp_path)
+
+
+class HashingReader:
+    def __init__(self, f):
+        # File wrapper that hashes everything read through it, so parsing and hashing share one pass
+        self.f = f
+        self.digest = hashlib.sha1()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+    def tell(self):
+        return self.f.tell()
@@ -1,385 +1,540 @@
+import gc
 import os
 import subprocess
+import sys
+import tempfile
 import time
 import math
 from xml.etree import ElementTree as ET
-from utils.color_utils import get_color
+from utils.color_utils import get_color, get_color_name
 from utils.config import PROJECT_ROOT, WORLDS_GAZEBO_DIR
+from classes.gazebo_transport import create_transport
+from classes.model_store import ModelStore
+from classes.model_records import as_record
+from classes.motion_runtime import precompute_trajectory
+from classes.motion_scenario import scenario_from_models, write_scenario
+from classes.spatial_index import SpatialIndex
+from classes.world_validator import find_conflicts
+from classes.world_cache import HashingReader, load_cache, save_cache
 
 class WorldManager:
-    def __init__(self, simulation, version):
-        # Initialize world manager with simulation and version
+    def __init__(self, simulation, version, transport=None):
+        # Initialize world manager with simulation, version and an optional service transport
         self.simulation = simulation
         self.version = version
         self.sdf_version = "1.8" if version == "fortress" else "1.9"
         self.world_path = None
         self.world_name = None
-        self.models = []
+        # Where worlds and their motion files are written; headless builds may point this elsewhere
+        self.worlds_dir = os.path.join(WORLDS_GAZEBO_DIR, version)
+        self.models = ModelStore()
+        # Last applied record of each "updated" model; the SDF keeps that until the update is applied
+        self.applied_models = {}
         self.sdf_tree = None
         self.sdf_root = None
+        self.world_elem = None
+        self.model_elements = {}
         self.process = None
         self.script_process = None
+        self.script_scenario = None
         self.base_dir = PROJECT_ROOT
+        self.transport = transport
+        self.batch_size = 50
+        self.ready_timeout = 10.0
+        self.poll_interval = 0.05
+        self.ready_world = None
+        self.motion_rate = 200.0
+        # Worker processes the motion runtime splits dynamic obstacles across
+        self.motion_workers = 1
+        # Seed of the obstacle velocity noise, stored in every <motion> block; None means unseeded
+        self.motion_seed = None
+        # "script" moves dynamic obstacles with the external motion runtime, "playback" precomputes
+        # motion_duration seconds of their trajectories and replays them
+        self.motion_mode = "script"
+        self.motion_duration = 60.0
+        # Whether playback restarts the recording at its end; otherwise the obstacles hold their last pose
+        self.motion_loop = False
+        # Callbacks told about model changes as listener(event, model), with event one of
+        # "added", "changed", "removed" or "reset" (model None: the whole world was replaced)
+        self.model_listeners = []
+        # Grid index over model footprints for point picks, box selection and nearest-model queries.
+        # It is built on first use (get_spatial_index), so loads and headless builds never pay for it.
+        self.spatial_index = SpatialIndex()
+        self.spatial_index_stale = True
+        self.add_model_listener(self.update_spatial_index)
 
-    def create_new_world(self, world_name):
-        # Create a new world from empty template
+    def create_new_world(self, world_name, launch=True):
+        # Create a new world from empty template; with launch=False no simulator is started
         self.world_name = world_name
         empty_world_path = os.path.join(WORLDS_GAZEBO_DIR, self.version, "empty_world.sdf")
         if not os.path.exists(empty_world_path):
             raise FileNotFoundError(f"Empty world file not found: {empty_world_path}")
 
-        if self.version == "fortress":
-            cmd = ["ign", "gazebo", empty_world_path]
-        else:
-            cmd = ["gz", "sim", empty_world_path]
-        self.process = subprocess.Popen(cmd)
-        self.world_path = os.path.join(WORLDS_GAZEBO_DIR, self.version, f"{world_name}.sdf")
-        self.models = []
-        self.sdf_tree = ET.parse(empty_world_path)
-        self.sdf_root = self.sdf_tree.getroot()
-        self.world_name = self.sdf_root.find("world").get("name")
-
-    def load_world(self, world_name):
-        # Load an existing world
+        if launch:
+            self.launch(empty_world_path)
+        self.world_path = os.path.join(self.worlds_dir, f"{world_name}.sdf")
+        self.read_sdf(empty_world_path)
+        self.models.clear()
+        # A new world starts unseeded, whatever world was loaded before
+        self.motion_seed = None
+        if not launch:
+            # No simulator runs the template, so the world can carry its own name (and motion file names)
+            self.world_elem.set("name", world_name)
+            self.world_name = world_name
+        self.notify_models("reset")
+
+    def load_world(self, world_name, progress=None, launch=True):
+        # Load an existing world, reporting progress(bytes_read, total_bytes) while parsing
         self.world_name = world_name
-        self.world_path = os.path.join(WORLDS_GAZEBO_DIR, self.version, f"{world_name}.sdf")
+        self.world_path = os.path.join(self.worlds_dir, f"{world_name}.sdf")
         if not os.path.exists(self.world_path):
             raise FileNotFoundError(f"World file not found: {self.world_path}")
 
+        if launch:
+            self.launch(self.world_path)
+
+        self.read_sdf(self.world_path, progress, use_cache=True)
+        self.notify_models("reset")
+
+    def launch(self, sdf_path):
+        # Start Gazebo on an SDF file and make sure a service transport is available
         if self.version == "fortress":
-            cmd = ["ign", "gazebo", self.world_path]
+            cmd = ["ign", "gazebo", sdf_path]
         else:
-            cmd = ["gz", "sim", self.world_path]
+            cmd = ["gz", "sim", sdf_path]
         self.process = subprocess.Popen(cmd)
+        self.ready_world = None
+        if self.transport is None:
+            self.transport = create_transport(self.version)
 
-        self.sdf_tree = ET.parse(self.world_path)
-        self.sdf_root = self.sdf_tree.getroot()
-        self.world_name = self.sdf_root.find("world").get("name")
-        self.models = []
-
-        # Map RGB values to color names
-        rgb_to_color = {
-            (0, 0, 0): "Black",
-            (0.5, 0.5, 0.5): "Gray",
-            (1, 1, 1): "White",
-            (1, 0, 0): "Red",
-            (0, 0, 1): "Blue",
-            (0, 1, 0): "Green"
-        }
+    def read_sdf(self, path, progress=None, use_cache=False):
+        # Stream the SDF file, turning each world-level <model> into a store entry as soon as it closes.
+        # Wizard-generated models (those with a <type> tag) are dropped from the tree and
+        # re-emitted from the store on save; other models are kept verbatim.
+        # With use_cache, a matching binary cache next to the file replaces the parse.
+        total_bytes = os.path.getsize(path)
+        self.applied_models.clear()
+        # Building many small containers triggers the cyclic GC repeatedly; pause it while loading
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            cached = load_cache(path) if use_cache else None
+            if cached is not None:
+                skeleton_xml, rows = cached
+                self.sdf_root = ET.fromstring(skeleton_xml)
+                self.models = ModelStore({"name": name, "type": model_type, "properties": properties, "status": ""}
+                                         for name, model_type, properties in rows)
+            else:
+                self.stream_sdf(path, total_bytes, progress, use_cache)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self.world_elem = self.sdf_root.find("world")
+        if self.world_elem is None:
+            raise ValueError("SDF file does not contain a <world> element")
+        motions = (m["properties"].get("motion", {}) for m in self.models.of_type("box", "cylinder", "sphere"))
+        self.motion_seed = next((motion["seed"] for motion in motions if "seed" in motion), None)
+        self.model_elements = {elem.get("name"): elem for elem in self.world_elem.findall("model")}
+        self.sdf_tree = ET.ElementTree(self.sdf_root)
+        self.world_name = self.world_elem.get("name")
+        if progress:
+            progress(total_bytes, total_bytes)
 
-        # Parse models from SDF
-        for model_elem in self.sdf_root.findall(".//model"):
-            name = model_elem.get("name")
-            type_elem = model_elem.find("type")
-            model_type = type_elem.text if type_elem is not None else None
-
-            if model_type is None:
-                geometry = model_elem.find(".//geometry")
-                if geometry is not None:
-                    if geometry.find("box") is not None:
-                        model_type = "wall" if "wall" in name else "box"
-                    elif geometry.find("cylinder") is not None:
-                        model_type = "cylinder"
-                    elif geometry.find("sphere") is not None:
-                        model_type = "sphere"
-                    else:
-                        model_type = "unknown"
-
-            properties = {}
-            pose_str = model_elem.find("pose").text
-            pose = [float(x) for x in pose_str.split()]
-            x, y, z, _, _, yaw = pose
-
-            # Parse color from material
-            material = model_elem.find(".//material/diffuse")
-            color_name = "Gray"
-            if material is not None:
-                rgb = tuple(float(x) for x in material.text.split()[:3])
-                color_name = rgb_to_color.get(rgb, "Gray")
-
-            geometry = model_elem.find(".//geometry")
-            if geometry:
-                if model_type in ["wall", "box"]:
-                    size_str = geometry.find("box/size").text
-                    size = [float(s) for s in size_str.split()]
-                    if model_type == "wall":
-                        length, width, height = size
-                        dx = (length / 2) * math.cos(yaw)
-                        dy = (length / 2) * math.sin(yaw)
-                        start_x = x - dx
-                        start_y = y - dy
-                        end_x = x + dx
-                        end_y = y + dy
-                        properties = {
-                            "start": (start_x, start_y),
-                            "end": (end_x, end_y),
-                            "width": width,
-                            "height": height,
-                            "color": color_name
-                        }
-                    else:
-                        properties = {
-                            "position": (x, y, z),
-                            "size": size,
-                            "color": color_name
-                        }
-                elif model_type == "cylinder":
-                    radius = float(geometry.find("cylinder/radius").text)
-                    length = float(geometry.find("cylinder/length").text)
+    def stream_sdf(self, path, total_bytes, progress=None, use_cache=False):
+        # Parse the SDF file model by model and optionally write the binary cache for it
+        self.models = ModelStore()
+        stat = os.stat(path)
+        generated = set()
+        with open(path, "rb") as raw:
+            f = HashingReader(raw)
+            parser = ET.iterparse(f, events=("start", "end"))
+            # Tags of the open elements, to tell world-level models from models nested in another model
+            open_tags = []
+            for event, elem in parser:
+                if event == "start":
+                    open_tags.append(elem.tag)
+                    continue
+                open_tags.pop()
+                if not open_tags or open_tags[-1] != "world":
+                    # Nested models (e.g. a sensor mount of a robot) stay part of their parent
+                    continue
+                if elem.tag != "model":
+                    continue
+                model = self.parse_model_element(elem)
+                self.models.add(model)
+                if elem.find("type") is not None:
+                    # Generated models live in the store from here on; keep only an empty shell
+                    elem.clear()
+                    generated.add(id(elem))
+                if progress and len(self.models) % 1000 == 0:
+                    progress(f.tell(), total_bytes)
+        self.sdf_root = parser.root
+        world_elem = self.sdf_root.find("world")
+        if world_elem is not None:
+            world_elem[:] = [child for child in world_elem if id(child) not in generated]
+        if use_cache:
+            rows = [(m.name, m.model_type, m.properties()) for m in self.models]
+            save_cache(path, stat, f.digest.digest(), ET.tostring(self.sdf_root), rows)
+
+    def parse_model_element(self, model_elem):
+        # Convert a <model> element into a model dict, walking its subtree only once
+        name = model_elem.get("name")
+        type_elem = model_elem.find("type")
+        model_type = type_elem.text if type_elem is not None else None
+        first = {}
+        for elem in model_elem.iter():
+            if elem.tag not in first:
+                first[elem.tag] = elem
+
+        if model_type is None:
+            geometry = first.get("geometry")
+            if geometry is not None:
+                if geometry.find("box") is not None:
+                    model_type = "wall" if "wall" in name else "box"
+                elif geometry.find("cylinder") is not None:
+                    model_type = "cylinder"
+                elif geometry.find("sphere") is not None:
+                    model_type = "sphere"
+                else:
+                    model_type = "unknown"
+
+        properties = {}
+        pose_elem = model_elem.find("pose")
+        pose_str = pose_elem.text if pose_elem is not None and pose_elem.text else "0 0 0 0 0 0"
+        pose = [float(x) for x in pose_str.split()]
+        x, y, z, _, _, yaw = pose
+
+        # Parse color from material
+        material = first.get("material")
+        material = material.find("diffuse") if material is not None else None
+        color_name = "Gray"
+        if material is not None:
+            color_name = get_color_name(tuple(float(x) for x in material.text.split()[:3]))
+
+        geometry = first.get("geometry")
+        if geometry:
+            if model_type in ["wall", "box"]:
+                size_str = geometry.find("box/size").text
+                size = [float(s) for s in size_str.split()]
+                if model_type == "wall":
+                    length, width, height = size
+                    dx = (length / 2) * math.cos(yaw)
+                    dy = (length / 2) * math.sin(yaw)
+                    start_x = x - dx
+                    start_y = y - dy
+                    end_x = x + dx
+                    end_y = y + dy
                     properties = {
-                        "position": (x, y, z),
-                        "size": (radius, length),
+                        "start": (start_x, start_y),
+                        "end": (end_x, end_y),
+                        "width": width,
+                        "height": height,
                         "color": color_name
                     }
-                elif model_type == "sphere":
-                    radius = float(geometry.find("sphere/radius").text)
+                else:
                     properties = {
                         "position": (x, y, z),
-                        "size": (radius,),
+                        "size": tuple(size),
                         "color": color_name
                     }
+            elif model_type == "cylinder":
+                radius = float(geometry.find("cylinder/radius").text)
+                length = float(geometry.find("cylinder/length").text)
+                properties = {
+                    "position": (x, y, z),
+                    "size": (radius, length),
+                    "color": color_name
+                }
+            elif model_type == "sphere":
+                radius = float(geometry.find("sphere/radius").text)
+                properties = {
+                    "position": (x, y, z),
+                    "size": (radius,),
+                    "color": color_name
+                }
+
+        # Parse motion for dynamic obstacles
+        motion_elem = first.get("motion")
+        if motion_elem is not None:
+            motion = {"type": motion_elem.find("type").text}
+            velocity = motion_elem.find("velocity")
+            if velocity is not None:
+                motion["velocity"] = float(velocity.text)
+            std = motion_elem.find("std")
+            if std is not None:
+                motion["std"] = float(std.text)
+            seed = motion_elem.find("seed")
+            if seed is not None:
+                motion["seed"] = int(seed.text)
+            if motion["type"] in ["linear", "polygon"]:
+                path = []
+                for point_elem in motion_elem.findall("point"):
+                    x = float(point_elem.find("x").text)
+                    y = float(point_elem.find("y").text)
+                    path.append((x, y))
+                motion["path"] = path
+            elif motion["type"] == "elliptical":
+                motion["semi_major"] = float(motion_elem.find("semi_major").text)
+                motion["semi_minor"] = float(motion_elem.find("semi_minor").text)
+                motion["angle"] = float(motion_elem.find("angle").text)
+            properties["motion"] = motion
+
+        return {
+            "name": name,
+            "type": model_type,
+            "properties": properties,
+            "status": ""
+        }
+
+    def add_model_listener(self, listener):
+        # Register a callback for model changes
+        self.model_listeners.append(listener)
+
+    def remove_model_listener(self, listener):
+        # Unregister a callback added with add_model_listener
+        if listener in self.model_listeners:
+            self.model_listeners.remove(listener)
+
+    def notify_models(self, event, model=None):
+        # Tell every listener about a model change
+        for listener in list(self.model_listeners):
+            listener(event, model)
 
-            # Parse motion for dynamic obstacles
-            motion_elem = model_elem.find(".//motion")
-            if motion_elem is not None:
-                motion = {"type": motion_elem.find("type").text}
-                velocity = motion_elem.find("velocity")
-                if velocity is not None:
-                    motion["velocity"] = float(velocity.text)
-                std = motion_elem.find("std")
-                if std is not None:
-                    motion["std"] = float(std.text)
-                if motion["type"] in ["linear", "polygon"]:
-                    path = []
-                    for point_elem in motion_elem.findall("point"):
-                        x = float(point_elem.find("x").text)
-                        y = float(point_elem.find("y").text)
-                        path.append((x, y))
-                    motion["path"] = path
-                elif motion["type"] == "elliptical":
-                    motion["semi_major"] = float(motion_elem.find("semi_major").text)
-                    motion["semi_minor"] = float(motion_elem.find("semi_minor").text)
-                    motion["angle"] = float(motion_elem.find("angle").text)
-                properties["motion"] = motion
-
-            self.models.append({
-                "name": name,
-                "type": model_type,
-                "properties": properties,
-                "status": ""
-            })
+    def get_spatial_index(self):
+        # Return the spatial index, rebuilding it first if the world was replaced since it was last used
+        if self.spatial_index_stale:
+            self.spatial_index.rebuild(self.models)
+            self.spatial_index_stale = False
+        return self.spatial_index
+
+    def update_spatial_index(self, event, model):
+        # Keep a built spatial index in step with model changes; a stale one is rebuilt on next use anyway
+        if event == "reset":
+            self.spatial_index_stale = True
+        elif self.spatial_index_stale:
+            return
+        elif event == "removed":
+            self.spatial_index.remove(model["name"])
+        else:
+            self.spatial_index.insert(model)
 
     def add_model(self, model):
-        # Add or update a model in the world
-        for existing_model in self.models:
-            if existing_model["name"] == model["name"]:
-                existing_model.update(model)
-                return
-        self.models.append(model)
+        # Add or update a model in the world, remembering the applied version of an updated model
+        previous = self.models.get(model["name"])
+        if model["status"] == "updated" and previous is not None and previous.status != "new":
+            self.applied_models.setdefault(model["name"], previous)
+        elif model["status"] != "updated":
+            self.applied_models.pop(model["name"], None)
+        existing = previous is not None
+        model = self.models.add(model)
+        self.notify_models("changed" if existing else "added", model)
+
+    def next_model_name(self, prefix):
+        # Return an unused model name of the form <prefix>_<n>
+        index = len(self.models) + 1
+        while f"{prefix}_{index}" in self.models:
+            index += 1
+        return f"{prefix}_{index}"
+
+    def remove_model(self, name):
+        # Mark a model for removal, or drop it outright if it was never applied
+        model = self.models.get(name)
+        if model is None:
+            return
+        if model["status"] == "new":
+            self.models.remove(name)
+            self.applied_models.pop(name, None)
+        else:
+            self.models.set_status(name, "removed")
+        self.notify_models("removed", model)
+
+    def validate(self, clearance=0.0):
+        # Find obstacles overlapping walls or each other and motion paths running into walls or
+        # static obstacles, as (name, other_name, reason) tuples; nothing is sent to the simulator
+        return find_conflicts(self.models, clearance)
 
     def apply_changes(self):
-        # Apply model changes to the simulation and SDF
+        # Apply model changes to the simulation and SDF, returning a success flag per model
         if not self.process or self.process.poll() is not None:
             raise RuntimeError("Gazebo simulation is not running. Please create or load a world first.")
 
-        time.sleep(2)
+        self.wait_until_ready()
 
-        prefix = "ign" if self.version == "fortress" else "gz"
-        reqtype_prefix = "ignition.msgs" if self.version == "fortress" else "gz.msgs"
+        results = {}
 
-        for model in self.models[:]:
+        # Remove updated and removed models from the simulation in batches
+        to_remove = self.models.with_status("updated", "removed")
+        removed = self.remove_entities([m["name"] for m in to_remove])
+        # Gazebo only drops a removed entity at the end of a step and refuses to create one under a name
+        # it still has, so updated models are respawned only once their old entity is gone from the scene
+        lingering = self.wait_for_removal([name for name, success in removed.items() if success])
+        detached = []
+        for model in to_remove:
+            if not removed[model["name"]] or model["name"] in lingering:
+                results[model["name"]] = False
+                continue
+            detached.append(model["name"])
+            # The simulator no longer has the applied version
+            self.applied_models.pop(model["name"], None)
             if model["status"] == "updated":
-                request_str = f'name: "{model["name"]}", type: 2'
-                cmd = [prefix, "service", "-s", f"/world/{self.world_name}/remove",
-                    "--reqtype", f"{reqtype_prefix}.Entity",
-                    "--reptype", f"{reqtype_prefix}.Boolean",
-                    "--timeout", "3000",
-                    "--req", request_str]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    continue
-                for elem in self.sdf_root.findall(f".//model[@name='{model['name']}']"):
-                    self.sdf_root.find("world").remove(elem)
-                self.save_sdf(self.world_path)
-                model["status"] = "new"
-
-            if model["status"] == "new":
-                sdf_snippet_service = self.generate_model_sdf(model, for_service=True)
-                sdf_escaped = sdf_snippet_service.replace('"', '\\"')
-                sdf_compact = ' '.join(sdf_escaped.split())
-                request_str = f'sdf: "{sdf_compact}"'
-                cmd = [prefix, "service", "-s", f"/world/{self.world_name}/create",
-                    "--reqtype", f"{reqtype_prefix}.EntityFactory",
-                    "--reptype", f"{reqtype_prefix}.Boolean",
-                    "--timeout", "3000",
-                    "--req", request_str]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0 or "data: true" not in result.stdout:
-                    continue
-                time.sleep(1)
-                sdf_snippet_file = self.generate_model_sdf(model, for_service=False)
-                model_elem = ET.fromstring(sdf_snippet_file)
-                for elem in self.sdf_root.findall(f".//model[@name='{model['name']}']"):
-                    self.sdf_root.find("world").remove(elem)
-                self.sdf_root.find("world").append(model_elem)
-                self.save_sdf(self.world_path)
-            elif model["status"] == "removed":
-                request_str = f'name: "{model["name"]}", type: 2'
-                cmd = [prefix, "service", "-s", f"/world/{self.world_name}/remove",
-                    "--reqtype", f"{reqtype_prefix}.Entity",
-                    "--reptype", f"{reqtype_prefix}.Boolean",
-                    "--timeout", "3000",
-                    "--req", request_str]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    continue
-                for elem in self.sdf_root.findall(f".//model[@name='{model['name']}']"):
-                    self.sdf_root.find("world").remove(elem)
-                self.save_sdf(self.world_path)
+                self.models.set_status(model["name"], "new")
+            else:
+                results[model["name"]] = True
+        self.detach_model_elements(detached)
+
+        # Spawn new and updated models in as few create requests as possible. A model whose create
+        # timed out on an earlier apply may have shown up since; it counts as created instead of being
+        # sent again under a name Gazebo already has
+        to_create = self.models.with_status("new")
+        pending = {m["name"] for m in to_create} - set(detached)
+        present = self.transport.list_models(self.world_name) & pending if pending else set()
+        created = self.create_entities([m for m in to_create if m["name"] not in present])
+        created.update(dict.fromkeys(present, True))
+        results.update(created)
+
+        # Make sure spawned models exist before the motion script starts moving them;
+        # models that never show up in the scene count as failed
+        for name in self.wait_for_models([name for name, success in created.items() if success]):
+            results[name] = False
+
+        for name, success in results.items():
+            if not success:
+                continue
+            if self.models.get(name)["status"] == "removed":
+                self.models.remove(name)
+            else:
+                self.models.set_status(name, "")
+
+        # Write the world file once for the whole apply, before the motion files, so a failure there
+        # cannot leave spawned models pending and unsaved
+        if detached or any(created.values()):
+            self.save_sdf(self.world_path)
+
+        # Write the motion scenario for dynamic models; a running motion runtime reloads it in place
+        dynamic_models = self.dynamic_models()
+        runtime_running = self.script_process is not None and self.script_process.poll() is None
+        if dynamic_models or runtime_running:
+            runtime_cmd, scenario_path = self.write_motion_files(dynamic_models)
 
-        # Generate motion script for dynamic models
-        dynamic_models = [m for m in self.models if "motion" in m["properties"]]
+            # Start the motion runtime unless one is already following this scenario
+            if not runtime_running or self.script_scenario != scenario_path:
+                self.stop_motion_script()
+                self.script_process = subprocess.Popen(runtime_cmd)
+                self.script_scenario = scenario_path
+        return results
+
+    def dynamic_models(self):
+        # Return the obstacles that have a motion and are not marked for removal
+        return [m for m in self.models.of_type("box", "cylinder", "sphere")
+                if "motion" in m["properties"] and m["status"] != "removed"]
+
+    def write_motion_files(self, dynamic_models):
+        # Write the motion scenario (precomputing the trajectory in playback mode) and the launch
+        # script, returning the motion runtime command line and the file it follows
+        move_code_dir = os.path.join(self.worlds_dir, "move_code")
+        scenario_path = os.path.join(move_code_dir, f"{self.world_name}_motion.json")
+        write_scenario(scenario_path, scenario_from_models(self.version, self.world_name, dynamic_models,
+                                                            self.motion_rate, self.motion_seed))
+        runtime_path = os.path.join(PROJECT_ROOT, "code", "dwg_motion.py")
+        if self.motion_mode == "playback":
+            trajectory_path = os.path.join(move_code_dir, f"{self.world_name}_trajectory.npy")
+            precompute_trajectory(scenario_path, trajectory_path, self.motion_duration)
+            scenario_path = trajectory_path
+        # Start the runtime with this interpreter, which is known to have numpy and the transport bindings
+        runtime_cmd = [sys.executable, runtime_path, scenario_path]
+        if self.motion_workers > 1:
+            runtime_cmd += ['--workers', str(self.motion_workers)]
+        if self.motion_mode == "playback" and self.motion_loop:
+            runtime_cmd += ['--loop']
+
+        # Generate launch script
+        launch_path = os.path.join(move_code_dir, f"{self.world_name}_launch.sh")
+        prefix = "ign" if self.version == "fortress" else "gz"
+        with open(launch_path, 'w') as f:
+            f.write('#!/bin/bash\n')
+            if self.version == "fortress":
+                f.write(f'ign gazebo {self.world_path} &\n')
+            else:
+                f.write(f'gz sim {self.world_path} &\n')
+            f.write(f'until {prefix} service -l | grep -qx "/world/{self.world_name}/set_pose_vector"; do sleep 0.1; done\n')
+            # The script may be run from another environment, so it uses the python3 found on PATH there
+            f.write(f'{" ".join(["python3"] + runtime_cmd[1:])} &\n')
+            f.write('wait\n')
+        os.chmod(launch_path, 0o755)
+        return runtime_cmd, scenario_path
+
+    def save_world(self):
+        # Write the world file and its motion files without a running simulator (headless builds)
+        self.save_sdf(self.world_path)
+        dynamic_models = self.dynamic_models()
         if dynamic_models:
-            move_code_dir = os.path.join(WORLDS_GAZEBO_DIR, self.version, "move_code")
-            os.makedirs(move_code_dir, exist_ok=True)
-            script_path = os.path.join(move_code_dir, f"{self.world_name}_moveObstacles.py")
-            with open(script_path, 'w') as f:
-                f.write('#!/usr/bin/env python3\n')
-                f.write('import time\n')
-                f.write('import random\n')
-                f.write('import math\n\n')
-                if self.version == "harmonic":
-                    f.write('from gz.transport13 import Node\n')
-                    f.write('from gz.msgs10.pose_pb2 import Pose\n')
-                    f.write('from gz.msgs10.boolean_pb2 import Boolean\n\n')
-                else:
-                    f.write('import subprocess\n\n')
-                f.write(f'prefix = "{"ign" if self.version == "fortress" else "gz"}\"\n')
-                f.write(f'reqtype_prefix = "{"ignition.msgs" if self.version == "fortress" else "gz.msgs"}\"\n')
-                f.write(f'world_name = "{self.world_name}"\n\n')
-                if self.version == "harmonic":
-                    f.write('node = Node()\n\n')
-                    f.write('def set_pose(model_name, x, y, z):\n')
-                    f.write('    req = Pose()\n')
-                    f.write('    req.name = model_name\n')
-                    f.write('    req.position.x = x\n')
-                    f.write('    req.position.y = y\n')
-                    f.write('    req.position.z = z\n')
-                    f.write('    req.orientation.w = 1.0\n')
-                    f.write('    success, rep = node.request(f"/world/{world_name}/set_pose", req, Pose, Boolean, 500)\n')
-                    f.write('    return success\n\n')
-                else:
-                    f.write('def set_pose(model_name, x, y, z):\n')
-                    f.write('    request_str = f\'name: "{model_name}", position {{ x: {x} y: {y} z: {z} }}, orientation {{ w: 1 }}\'\n')
-                    f.write('    cmd = [prefix, "service", "-s", f"/world/{world_name}/set_pose", "--reqtype", f"{reqtype_prefix}.Pose", "--reptype", f"{reqtype_prefix}.Boolean", "--timeout", "500", "--req", request_str]\n')
-                    f.write('    result = subprocess.run(cmd, capture_output=True, text=True)\n')
-                    f.write('    if result.returncode != 0:\n')
-                    f.write('        return False\n')
-                    f.write('    return True\n\n')
-                f.write('motions = {}\nstates = {}\n')
-                for m in dynamic_models:
-                    motion = m["properties"]["motion"]
-                    z = m["properties"]["position"][2]
-                    state = {}
-                    if motion["type"] == "linear":
-                        start, end = motion["path"]
-                        state = {'current_pos': list(start), 'direction': 1, 'start': list(start), 'end': list(end), 'z': z}
-                    elif motion["type"] == "elliptical":
-                        state = {'theta': 0.0, 'center': list(m["properties"]["position"][:2]), 'semi_major': motion["semi_major"], 'semi_minor': motion["semi_minor"], 'angle': motion["angle"], 'z': z}
-                    elif motion["type"] == "polygon":
-                        state = {'current_segment': 0, 't': 0.0, 'path': [list(p) for p in motion["path"]], 'z': z}
-                    f.write(f'motions["{m["name"]}"] = {motion}\n')
-                    f.write(f'states["{m["name"]}"] = {state}\n')
-                f.write('\ndt = 0.005\nlinear_dt = 0.001\nwhile True:\n')
-                f.write('    try:\n')
-                f.write('        for model_name, motion in motions.items():\n')
-                f.write('            state = states[model_name]\n')
-                f.write('            velocity = max(min(random.gauss(motion["velocity"], motion["std"]), motion["velocity"] * 2), 0)\n')
-                f.write('            delta = velocity * (linear_dt if motion["type"] == "linear" else dt)\n')
-                f.write('            if motion["type"] == "linear":\n')
-                f.write('                start = state["start"]\n')
-                f.write('                end = state["end"]\n')
-                f.write('                dx = end[0] - start[0]\n')
-                f.write('                dy = end[1] - start[1]\n')
-                f.write('                length = math.sqrt(dx**2 + dy**2)\n')
-                f.write('                if length < 0.001: continue\n')
-                f.write('                unit_x = dx / length\n')
-                f.write('                unit_y = dy / length\n')
-                f.write('                new_x = state["current_pos"][0] + delta * state["direction"] * unit_x\n')
-                f.write('                new_y = state["current_pos"][1] + delta * state["direction"] * unit_y\n')
-                f.write('                t = ((new_x - start[0]) * dx + (new_y - start[1]) * dy) / (length**2)\n')
-                f.write('                if t > 1:\n')
-                f.write('                    new_x = end[0]\n')
-                f.write('                    new_y = end[1]\n')
-                f.write('                    state["direction"] = -state["direction"]\n')
-                f.write('                elif t < 0:\n')
-                f.write('                    new_x = start[0]\n')
-                f.write('                    new_y = start[1]\n')
-                f.write('                    state["direction"] = -state["direction"]\n')
-                f.write('                else:\n')
-                f.write('                    new_x = start[0] + t * dx\n')
-                f.write('                    new_y = start[1] + t * dy\n')
-                f.write('                state["current_pos"] = [new_x, new_y]\n')
-                f.write('                if not set_pose(model_name, new_x, new_y, state["z"]):\n')
-                f.write('                    exit(1)\n')
-                f.write('            elif motion["type"] == "elliptical":\n')
-                f.write('                delta_theta = velocity / (2 * math.pi * motion["semi_major"]) * 2 * math.pi * dt\n')
-                f.write('                state["theta"] += delta_theta\n')
-                f.write('                theta = state["theta"]\n')
-                f.write('                x = state["center"][0] + motion["semi_major"] * math.cos(theta) * math.cos(motion["angle"]) - motion["semi_minor"] * math.sin(theta) * math.sin(motion["angle"])\n')
-                f.write('                y = state["center"][1] + motion["semi_major"] * math.cos(theta) * math.sin(motion["angle"]) + motion["semi_minor"] * math.sin(theta) * math.cos(motion["angle"])\n')
-                f.write('                if not set_pose(model_name, x, y, state["z"]):\n')
-                f.write('                    exit(1)\n')
-                f.write('            elif motion["type"] == "polygon":\n')
-                f.write('                path = state["path"]\n')
-                f.write('                start = path[state["current_segment"]]\n')
-                f.write('                end = path[(state["current_segment"] + 1) % len(path)]\n')
-                f.write('                dx = end[0] - start[0]\n')
-                f.write('                dy = end[1] - start[1]\n')
-                f.write('                length = math.sqrt(dx**2 + dy**2)\n')
-                f.write('                if length < 0.001: continue\n')
-                f.write('                state["t"] += delta / length\n')
-                f.write('                while state["t"] >= 1:\n')
-                f.write('                    state["t"] -= 1\n')
-                f.write('                    state["current_segment"] = (state["current_segment"] + 1) % len(path)\n')
-                f.write('                start = path[state["current_segment"]]\n')
-                f.write('                end = path[(state["current_segment"] + 1) % len(path)]\n')
-                f.write('                dx = end[0] - start[0]\n')
-                f.write('                dy = end[1] - start[1]\n')
-                f.write('                x = start[0] + state["t"] * dx\n')
-                f.write('                y = start[1] + state["t"] * dy\n')
-                f.write('                if not set_pose(model_name, x, y, state["z"]):\n')
-                f.write('                    exit(1)\n')
-                f.write('        time.sleep(linear_dt if motion["type"] == "linear" else dt)\n')
-                f.write('    except KeyboardInterrupt:\n')
-                f.write('        exit(0)\n')
-            os.chmod(script_path, 0o755)
-
-            # Generate launch script
-            launch_path = os.path.join(WORLDS_GAZEBO_DIR, self.version, "move_code", f"{self.world_name}_launch.sh")
-            with open(launch_path, 'w') as f:
-                f.write('#!/bin/bash\n')
-                if self.version == "fortress":
-                    f.write(f'ign gazebo {self.world_path} &\n')
-                else:
-                    f.write(f'gz sim {self.world_path} &\n')
-                f.write('sleep 2\n')
-                f.write(f'python3 {script_path} &\n')
-                f.write('wait\n')
-            os.chmod(launch_path, 0o755)
-
-            # Manage motion script process
-            if self.script_process and self.script_process.poll() is None:
-                self.script_process.terminate()
-                try:
-                    self.script_process.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    self.script_process.kill()
-            self.script_process = subprocess.Popen(['python3', script_path])
+            self.write_motion_files(dynamic_models)
+
+    def stop_motion_script(self):
+        # Stop the external motion script if it is running
+        if self.script_process and self.script_process.poll() is None:
+            self.script_process.terminate()
+            try:
+                self.script_process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.script_process.kill()
+        self.script_process = None
+        self.script_scenario = None
+
+    def wait_until_ready(self, timeout=None):
+        # Poll until the world's entity services are advertised instead of sleeping a fixed time
+        if self.ready_world == self.world_name:
+            return
+        timeout = self.ready_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while not self.transport.is_world_ready(self.world_name):
+            if self.process and self.process.poll() is not None:
+                raise RuntimeError("Gazebo simulation exited before the world became ready.")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"World '{self.world_name}' was not ready after {timeout} s.")
+            time.sleep(self.poll_interval)
+        self.ready_world = self.world_name
+
+    def wait_for_models(self, names, timeout=None):
+        # Poll the scene until the given models appear, returning the names still missing at timeout
+        missing = set(names)
+        deadline = time.monotonic() + (self.ready_timeout if timeout is None else timeout)
+        while missing:
+            missing -= self.transport.list_models(self.world_name)
+            if not missing or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+        return missing
+
+    def wait_for_removal(self, names, timeout=None):
+        # Poll the scene until the given models are gone, returning the names still present at timeout
+        present = set(names)
+        deadline = time.monotonic() + (self.ready_timeout if timeout is None else timeout)
+        while present:
+            present &= self.transport.list_models(self.world_name)
+            if not present or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+        return present
+
+    def create_entities(self, models):
+        # Spawn models in batches of at most batch_size per create request
+        results = {}
+        for i in range(0, len(models), self.batch_size):
+            batch = models[i:i + self.batch_size]
+            snippets = [self.generate_model_sdf(model, for_service=True) for model in batch]
+            for model, success in zip(batch, self.transport.create_entities(self.world_name, snippets)):
+                results[model["name"]] = success
+        return results
 
-        self.models = [m for m in self.models if m["status"] != "removed"]
-        for model in self.models:
-            model["status"] = ""
+    def remove_entities(self, names):
+        # Remove models in batches of at most batch_size names
+        results = {}
+        for i in range(0, len(names), self.batch_size):
+            batch = names[i:i + self.batch_size]
+            results.update(zip(batch, self.transport.remove_entities(self.world_name, batch)))
+        return results
 
     def cleanup(self):
         # Clean up processes and save world state
@@ -390,6 +545,9 @@ class WorldManager:
             except Exception:
                 pass
 
+        if self.transport:
+            self.transport.close()
+
         # Terminate motion script process
         if self.script_process and self.script_process.poll() is None:
             try:
@@ -423,26 +581,28 @@ class WorldManager:
             self.process = None
 
     def generate_model_sdf(self, model, for_service=False):
-        # Generate SDF snippet for a model
-        model_type = model["type"]
-        props = model["properties"]
-        color_rgb = get_color(props["color"])
+        # Generate SDF snippet for a model (dict or record), reading the fields of its typed record
+        record = as_record(model)
+        model_type = record.model_type
+        color_rgb = get_color(record.color)
+        motion = None
 
         if model_type == "wall":
-            start = props["start"]
-            end = props["end"]
+            start = (record.start_x, record.start_y)
+            end = (record.end_x, record.end_y)
             center_x = (start[0] + end[0]) / 2
             center_y = (start[1] + end[1]) / 2
-            z = props["height"] / 2
+            z = record.height / 2
             length = ((end[0] - start[0])**2 + (end[1] - start[1])**2)**0.5
             yaw = math.atan2(end[1] - start[1], end[0] - start[0])
             pose = f"{center_x:.6f} {center_y:.6f} {z:.6f} 0 0 {yaw:.6f}"
-            size = (length, props["width"], props["height"])
+            size = (length, record.width, record.height)
             size_str = f"{size[0]:.6f} {size[1]:.6f} {size[2]:.6f}"
         else:
-            x, y, z = props["position"]
+            x, y, z = record.x, record.y, record.z
             pose = f"{x:.6f} {y:.6f} {z:.6f} 0 0 0"
-            size = props["size"]
+            size = record.size()
+            motion = record.motion
             if model_type == "box":
                 size_str = f"{size[0]:.6f} {size[1]:.6f} {size[2]:.6f}"
             elif model_type == "cylinder":
@@ -450,8 +610,8 @@ class WorldManager:
             elif model_type == "sphere":
                 size_str = f"{size[0]:.6f}"
 
-        static_str = "false" if "motion" in model["properties"] else "true"
-        sdf = f"""<model name='{model["name"]}'>
+        static_str = "false" if motion is not None else "true"
+        sdf = f"""<model name='{record.name}'>
             <static>{static_str}</static>
             <type>{model_type}</type>
             <pose>{pose}</pose>
@@ -510,30 +670,60 @@ class WorldManager:
             sdf += inertial_str
             sdf += "<gravity>false</gravity>"
         sdf += """</link>"""
-        if "motion" in props:
-            motion = props["motion"]
+        if motion is not None:
             sdf += "<motion>"
-            sdf += f"<type>{motion['type']}</type>"
-            sdf += f"<velocity>{motion['velocity']:.6f}</velocity>"
-            sdf += f"<std>{motion['std']:.6f}</std>"
-            if "path" in motion:
-                for p in motion["path"]:
+            sdf += f"<type>{motion.type}</type>"
+            sdf += f"<velocity>{motion.velocity:.6f}</velocity>"
+            sdf += f"<std>{motion.std:.6f}</std>"
+            if self.motion_seed is not None:
+                sdf += f"<seed>{self.motion_seed}</seed>"
+            if motion.path is not None:
+                for p in motion.path:
                     sdf += f"<point><x>{p[0]:.6f}</x><y>{p[1]:.6f}</y></point>"
-            if "semi_major" in motion:
-                sdf += f"<semi_major>{motion['semi_major']:.6f}</semi_major>"
-                sdf += f"<semi_minor>{motion['semi_minor']:.6f}</semi_minor>"
-                sdf += f"<angle>{motion['angle']:.6f}</angle>"
+            if motion.semi_major is not None:
+                sdf += f"<semi_major>{motion.semi_major:.6f}</semi_major>"
+                sdf += f"<semi_minor>{motion.semi_minor:.6f}</semi_minor>"
+                sdf += f"<angle>{motion.angle:.6f}</angle>"
             sdf += "</motion>"
         sdf += "</model>"
         if for_service:
             sdf = f"""<sdf version='{self.sdf_version}'>{sdf}</sdf>"""
         return sdf
 
+    def detach_model_elements(self, names):
+        # Remove several model elements from the world in a single pass
+        doomed = {id(self.model_elements.pop(name)) for name in names if name in self.model_elements}
+        if doomed:
+            self.world_elem[:] = [child for child in self.world_elem if id(child) not in doomed]
+
     def save_sdf(self, path):
-        # Save SDF file to disk
+        # Save SDF file to disk atomically, so a crash mid-write leaves the previous file intact.
+        # The tree holds everything except wizard-generated models, which are streamed from the store.
         if self.sdf_tree:
+            marker = ET.Comment("generated models")
+            self.world_elem.append(marker)
             try:
-                os.makedirs(os.path.dirname(path), exist_ok=True)
-                self.sdf_tree.write(path, encoding="utf-8", xml_declaration=True)
-            except Exception as e:
-                raise
\ No newline at end of file
+                head, tail = ET.tostring(self.sdf_root, encoding="unicode").split("<!--generated models-->")
+            finally:
+                self.world_elem.remove(marker)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".sdf.tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+                    f.write(head)
+                    for model in self.models:
+                        if model["status"] != "new" and model["name"] not in self.model_elements:
+                            # Unapplied edits stay out of the file, which mirrors what the simulator has
+                            model = self.applied_models.get(model["name"], model)
+                            f.write(self.generate_model_sdf(model))
+                            f.write("\n  ")
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
@@ -0,0 +1,248 @@
+import numpy as np
+from classes.model_records import Box, MotionView, Obstacle, Wall, as_record
+from classes.motion_paths import trajectory_waypoints
+from classes.spatial_index import segment_cells
+
+# Shape kinds: a capsule is a segment with a radius (walls, cylinders, spheres and motion path sweeps),
+# a box is an axis-aligned rectangle
+CAPSULE, BOX = 0, 1
+# Roles of a shape in the world
+WALL, OBSTACLE, PATH = 0, 1, 2
+# Slack so shapes that only touch, like obstacles snapped flush against a wall, are not conflicts
+EPSILON = 1e-9
+
+
+def world_shapes(models):
+    # Flatten models into shape columns: kind, role, owner (index into the returned names),
+    # static flag of the owner, segment or box corners (x0, y0, x1, y1) and radius
+    rows = []
+    names = []
+    for model in models:
+        record = as_record(model)
+        if record.status == "removed":
+            continue
+        owner = len(names)
+        if isinstance(record, Wall):
+            # Walls are capsules, so their ends reach width / 2 past the end points
+            rows.append((CAPSULE, WALL, owner, True, record.start_x, record.start_y, record.end_x, record.end_y,
+                         record.width / 2))
+        elif isinstance(record, Obstacle):
+            x, y = record.x, record.y
+            motion = record.motion
+            static = motion is None
+            if isinstance(record, Box):
+                half_x, half_y = record.width / 2, record.length / 2
+                rows.append((BOX, OBSTACLE, owner, static, x - half_x, y - half_y, x + half_x, y + half_y, 0.0))
+                # The box does not rotate, but its sweep is bounded by its circumscribed circle
+                sweep_radius = float(np.hypot(half_x, half_y))
+            else:
+                sweep_radius = record.radius
+                rows.append((CAPSULE, OBSTACLE, owner, static, x, y, x, y, sweep_radius))
+            if not static:
+                points = [(px, py) for _, px, py in trajectory_waypoints((x, y), MotionView(motion))]
+                if motion.type == "linear":
+                    # Back and forth over the same segment
+                    points = points[:2]
+                for (ax, ay), (bx, by) in zip(points, points[1:]):
+                    rows.append((CAPSULE, PATH, owner, False, ax, ay, bx, by, sweep_radius))
+        else:
+            continue
+        names.append(record.name)
+    if not rows:
+        rows = np.zeros((0, 9))
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 9).T
+    kind, role, owner, static = (columns[0].astype(np.int8), columns[1].astype(np.int8),
+                                 columns[2].astype(np.int64), columns[3].astype(bool))
+    return names, kind, role, owner, static, columns[4:8], columns[8]
+
+
+def shape_bounds(kind, coords, radius):
+    # Axis-aligned bounding boxes (min_x, min_y, max_x, max_y) of the shapes
+    x0, y0, x1, y1 = coords
+    return (np.minimum(x0, x1) - radius, np.minimum(y0, y1) - radius,
+            np.maximum(x0, x1) + radius, np.maximum(y0, y1) + radius)
+
+
+def candidate_pairs(bounds, cell_size, accept=None, segments=None):
+    # Broad phase: pairs (i < j) of shapes whose bounding boxes share a grid cell and overlap,
+    # keeping only those for which accept(first, second) is true when given. segments, when given,
+    # is (is_segment, coords, reach): those shapes are registered only in the cells within reach of
+    # their segment instead of every cell of their bounding box
+    min_x, min_y, max_x, max_y = bounds
+    count = len(min_x)
+    if count < 2:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    i0 = np.floor(min_x / cell_size).astype(np.int64)
+    j0 = np.floor(min_y / cell_size).astype(np.int64)
+    i1 = np.floor(max_x / cell_size).astype(np.int64)
+    j1 = np.floor(max_y / cell_size).astype(np.int64)
+    width, height = i1 - i0 + 1, j1 - j0 + 1
+    # A long diagonal wall or path covers about (length / cell_size)^2 cells of its bounding box but only a
+    # band of them along the segment; segments spanning few cells on either axis are cheaper as boxes
+    band = np.zeros(count, bool)
+    if segments is not None:
+        band = segments[0] & (width > 2) & (height > 2)
+    cells_per_shape = np.where(band, 0, width * height)
+
+    # One (cell, shape) row per covered cell
+    shape = np.repeat(np.arange(count), cells_per_shape)
+    offset = np.arange(len(shape)) - np.repeat(np.cumsum(cells_per_shape) - cells_per_shape, cells_per_shape)
+    cell_i = i0[shape] + offset // height[shape]
+    cell_j = j0[shape] + offset % height[shape]
+    if band.any():
+        _, (x0, y0, x1, y1), reach = segments
+        shapes, cells = [shape], []
+        for index in np.flatnonzero(band).tolist():
+            keys = segment_cells(x0[index], y0[index], x1[index], y1[index], reach[index], cell_size)
+            shapes.append(np.full(len(keys), index))
+            cells.extend(keys)
+        cells = np.array(cells, dtype=np.int64).reshape(-1, 2)
+        shape = np.concatenate(shapes)
+        cell_i, cell_j = np.concatenate([cell_i, cells[:, 0]]), np.concatenate([cell_j, cells[:, 1]])
+    span = int(cell_j.max() - cell_j.min()) + 1
+    key = (cell_i - cell_i.min()) * span + (cell_j - cell_j.min())
+    order = np.lexsort((shape, key))
+    key, shape = key[order], shape[order]
+
+    # Rows of the same cell are adjacent after sorting; pair each row with the ones d rows further on.
+    # Once no rows d apart share a cell, no rows further apart do either.
+    firsts, seconds = [], []
+    for d in range(1, len(key)):
+        same = key[d:] == key[:-d]
+        if not same.any():
+            break
+        first, second = shape[:-d][same], shape[d:][same]
+        if accept is not None:
+            # Filter before deduplicating: most pairs in crowded cells are never checked
+            keep = accept(first, second)
+            first, second = first[keep], second[keep]
+        firsts.append(first)
+        seconds.append(second)
+    if not firsts:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    first, second = np.concatenate(firsts), np.concatenate(seconds)
+
+    # Shapes sharing several cells give duplicate pairs
+    pair = np.unique(np.minimum(first, second) * count + np.maximum(first, second))
+    first, second = pair // count, pair % count
+    overlap = ((min_x[first] <= max_x[second]) & (min_x[second] <= max_x[first])
+               & (min_y[first] <= max_y[second]) & (min_y[second] <= max_y[first]))
+    return first[overlap], second[overlap]
+
+
+def point_segment_distance(px, py, ax, ay, bx, by):
+    # Distances from points to segments, elementwise
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    safe = np.where(length_sq > 0, length_sq, 1.0)
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / safe, 0.0, 1.0)
+    t = np.where(length_sq > 0, t, 0.0)
+    return np.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def segment_distance(ax, ay, bx, by, cx, cy, dx, dy):
+    # Distances between segments a-b and c-d, elementwise; 0 where they cross
+    def side(px, py, qx, qy, rx, ry):
+        return np.sign((qx - px) * (ry - py) - (qy - py) * (rx - px))
+    crossing = ((side(ax, ay, bx, by, cx, cy) * side(ax, ay, bx, by, dx, dy) < 0)
+                & (side(cx, cy, dx, dy, ax, ay) * side(cx, cy, dx, dy, bx, by) < 0))
+    # Without a proper crossing the closest points include an end point of one of the segments
+    distance = np.minimum(np.minimum(point_segment_distance(ax, ay, cx, cy, dx, dy),
+                                     point_segment_distance(bx, by, cx, cy, dx, dy)),
+                          np.minimum(point_segment_distance(cx, cy, ax, ay, bx, by),
+                                     point_segment_distance(dx, dy, ax, ay, bx, by)))
+    return np.where(crossing, 0.0, distance)
+
+
+def segment_box_distance(ax, ay, bx, by, min_x, min_y, max_x, max_y):
+    # Distances between segments and axis-aligned boxes, elementwise; 0 where they touch
+    inside = (((min_x <= ax) & (ax <= max_x) & (min_y <= ay) & (ay <= max_y))
+              | ((min_x <= bx) & (bx <= max_x) & (min_y <= by) & (by <= max_y)))
+    distance = np.minimum(
+        np.minimum(segment_distance(ax, ay, bx, by, min_x, min_y, max_x, min_y),
+                   segment_distance(ax, ay, bx, by, max_x, min_y, max_x, max_y)),
+        np.minimum(segment_distance(ax, ay, bx, by, max_x, max_y, min_x, max_y),
+                   segment_distance(ax, ay, bx, by, min_x, max_y, min_x, min_y)))
+    return np.where(inside, 0.0, distance)
+
+
+def separation(kind, coords, radius, first, second):
+    # Narrow phase: signed gap between shape pairs, negative where they overlap
+    x0, y0, x1, y1 = coords
+    gap = np.empty(len(first))
+
+    # Capsule against capsule
+    mask = (kind[first] == CAPSULE) & (kind[second] == CAPSULE)
+    a, b = first[mask], second[mask]
+    gap[mask] = segment_distance(x0[a], y0[a], x1[a], y1[a], x0[b], y0[b], x1[b], y1[b]) - radius[a] - radius[b]
+
+    # Box against box: the larger axis gap, which is negative only if they overlap on both axes
+    mask = (kind[first] == BOX) & (kind[second] == BOX)
+    a, b = first[mask], second[mask]
+    gap_x = np.maximum(x0[b] - x1[a], x0[a] - x1[b])
+    gap_y = np.maximum(y0[b] - y1[a], y0[a] - y1[b])
+    gap[mask] = np.where((gap_x > 0) & (gap_y > 0), np.hypot(gap_x, gap_y), np.maximum(gap_x, gap_y))
+
+    # Capsule against box, in either order; a capsule whose segment touches the box overlaps it by its radius
+    mask = kind[first] != kind[second]
+    capsule = np.where(kind[first] == CAPSULE, first, second)[mask]
+    box = np.where(kind[first] == CAPSULE, second, first)[mask]
+    gap[mask] = segment_box_distance(x0[capsule], y0[capsule], x1[capsule], y1[capsule],
+                                     x0[box], y0[box], x1[box], y1[box]) - radius[capsule]
+    return gap
+
+
+def find_conflicts(models, clearance=0.0, cell_size=None):
+    # Find obstacles overlapping walls or other obstacles, and motion paths (swept by their obstacle)
+    # crossing walls or static obstacles. Returns sorted (name, other_name, reason) tuples with reason
+    # "overlap" or "path"; name is the obstacle or, for "path", the obstacle whose path it is.
+    names, kind, role, owner, static, coords, radius = world_shapes(models)
+    reach = radius + clearance / 2
+    bounds = shape_bounds(kind, coords, reach)
+    if cell_size is None:
+        # Cells about twice the typical shape size keep most shapes in a few cells
+        extent = np.maximum(bounds[2] - bounds[0], bounds[3] - bounds[1])
+        cell_size = max(2.0 * float(np.median(extent)), 0.1) if len(extent) else 1.0
+
+    def relevant(first, second):
+        # Pairs of different models that can conflict: obstacles against walls and other obstacles,
+        # and paths against walls and static obstacles
+        role_a, role_b = np.minimum(role[first], role[second]), np.maximum(role[first], role[second])
+        static_a = np.where(role[first] <= role[second], static[first], static[second])
+        return ((owner[first] != owner[second])
+                & (((role_a == WALL) & (role_b == OBSTACLE))
+                   | ((role_a == OBSTACLE) & (role_b == OBSTACLE))
+                   | ((role_a == WALL) & (role_b == PATH))
+                   # A path only conflicts with obstacles that stay where they are
+                   | ((role_a == OBSTACLE) & (role_b == PATH) & static_a)))
+
+    first, second = candidate_pairs(bounds, cell_size, relevant, (kind == CAPSULE, coords, reach))
+    # Put the shape with the lower role first: (wall, obstacle), (wall, path), (obstacle, path), ...
+    swap = role[first] > role[second]
+    first, second = np.where(swap, second, first), np.where(swap, first, second)
+
+    hit = separation(kind, coords, radius, first, second) < clearance - EPSILON
+    first, second = first[hit], second[hit]
+    conflicts = set()
+    for a, b in zip(first.tolist(), second.tolist()):
+        if role[b] == PATH:
+            conflicts.add((names[owner[b]], names[owner[a]], "path"))
+        elif role[a] == WALL:
+            conflicts.add((names[owner[b]], names[owner[a]], "overlap"))
+        else:
+            pair = sorted((names[owner[a]], names[owner[b]]))
+            conflicts.add((pair[0], pair[1], "overlap"))
+    return sorted(conflicts)
+
+
+def describe_conflicts(conflicts, limit=10):
+    # Human readable lines for the first conflicts, with a count of the rest
+    lines = []
+    for name, other, reason in conflicts[:limit]:
+        if reason == "path":
+            lines.append(f"The motion path of {name} runs into {other}")
+        else:
+            lines.append(f"{name} overlaps {other}")
+    if len(conflicts) > limit:
+        lines.append(f"... and {len(conflicts) - limit} more")
+    return lines
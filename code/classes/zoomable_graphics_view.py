@@ -1,5 +1,7 @@
 from PyQt5.QtWidgets import QGraphicsView, QLabel
-from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtCore import Qt, QPointF, QLineF
+from PyQt5.QtGui import QPen, QColor
+import math
 
 class ZoomableGraphicsView(QGraphicsView):
     def __init__(self, scene):
@@ -10,12 +12,41 @@ class ZoomableGraphicsView(QGraphicsView):
         self.scale_label.setGeometry(10, self.height() - 38, 105, 20)
         self.is_panning = False
         self.last_pan_point = QPointF()
+        # Grid spacing in scene units (10 cm) and the closest on-screen spacing in pixels before it is coarsened
+        self.grid_spacing = 10
+        self.min_grid_pixels = 8
+        self.grid_pen = QPen(QColor("lightgray"), 0)
+        # Items draw their own level of detail and never paint outside their bounds
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, True)
 
     def resizeEvent(self, event):
         # Update scale label position on window resize
         super().resizeEvent(event)
         self.scale_label.move(10, self.height() - 38)
 
+    def drawBackground(self, painter, rect):
+        # Draw the grid over the exposed rect only, coarsening it by factors of 10 when zoomed out
+        super().drawBackground(painter, rect)
+        pixels_per_unit = abs(self.transform().m11()) or 1.0
+        spacing = self.grid_spacing
+        if spacing * pixels_per_unit < self.min_grid_pixels:
+            spacing *= 10 ** math.ceil(math.log10(self.min_grid_pixels / (spacing * pixels_per_unit)))
+        left = math.floor(rect.left() / spacing) * spacing
+        top = math.floor(rect.top() / spacing) * spacing
+        lines = []
+        x = left
+        while x <= rect.right():
+            lines.append(QLineF(x, rect.top(), x, rect.bottom()))
+            x += spacing
+        y = top
+        while y <= rect.bottom():
+            lines.append(QLineF(rect.left(), y, rect.right(), y))
+            y += spacing
+        painter.save()
+        painter.setPen(self.grid_pen)
+        painter.drawLines(lines)
+        painter.restore()
+
     def wheelEvent(self, event):
         # Zoom in or out based on mouse wheel direction
         zoom_factor = 1.25 if event.angleDelta().y() > 0 else 0.8
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from classes.world_batch import generate_batch
+from classes.world_builder import build_world_files, load_spec, world_from_spec
+from classes.world_validator import describe_conflicts
+
+
+def parse_seeds(text):
+    # Parse a seed range "start:stop" (stop excluded) or a comma separated list of seeds
+    if ":" in text:
+        start, stop = text.split(":")
+        return range(int(start), int(stop))
+    return [int(seed) for seed in text.split(",")]
+
+
+def main(argv=None):
+    # Headless command line: build worlds from spec files without the wizard or a running simulator
+    parser = argparse.ArgumentParser(description="Build Gazebo worlds from JSON/YAML specs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="write the SDF and motion files of one or more world specs")
+    build.add_argument("specs", nargs="+", help="world spec files (.json, .yaml or .yml)")
+    build.add_argument("-o", "--output-dir", help="directory for the worlds (default: worlds/gazebo/<version>)")
+    build.add_argument("--version", choices=["harmonic", "fortress"], help="override the Gazebo version of the specs")
+    build.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    batch = subparsers.add_parser("batch", help="render randomized variants of a world template, one per seed")
+    batch.add_argument("template", help="parameterized world template (.json, .yaml or .yml)")
+    batch.add_argument("--seeds", type=parse_seeds, default=range(100), help="seed range start:stop or list (default: 0:100)")
+    batch.add_argument("-o", "--output-dir", required=True, help="directory for the generated worlds")
+    batch.add_argument("--version", choices=["harmonic", "fortress"], help="override the Gazebo version of the template")
+    batch.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    check = subparsers.add_parser("check", help="report overlapping models and blocked motion paths in world specs")
+    check.add_argument("specs", nargs="+", help="world spec files (.json, .yaml or .yml)")
+    check.add_argument("--clearance", type=float, default=0.0, help="minimum gap between models in meters (default: 0)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        for path in build_world_files(args.specs, args.output_dir, args.version, args.jobs):
+            print(path)
+    elif args.command == "batch":
+        for _ in generate_batch(load_spec(args.template), args.seeds, args.output_dir, args.version, args.jobs):
+            pass
+    elif args.command == "check":
+        status = 0
+        for path in args.specs:
+            conflicts = world_from_spec(load_spec(path)).validate(args.clearance)
+            print(f"{path}: {len(conflicts)} conflicts")
+            for line in describe_conflicts(conflicts, limit=len(conflicts)):
+                print(f"  {line}")
+            status = status or (1 if conflicts else 0)
+        return status
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+import sys
+from classes.motion_runtime import main
+
+if __name__ == "__main__":
+    # Run the motion loop for a scenario file: dwg_motion.py <world>_motion.json [--rate HZ]
+    sys.exit(main())
@@ -8,4 +8,16 @@ def get_color(color_name):
         "Blue": (0, 0, 1),
         "Green": (0, 1, 0)
     }
-    return colors.get(color_name, (0.5, 0.5, 0.5))
\ No newline at end of file
+    return colors.get(color_name, (0.5, 0.5, 0.5))
+
+def get_color_name(rgb):
+    # Map RGB tuples back to color names
+    rgb_to_color = {
+        (0, 0, 0): "Black",
+        (0.5, 0.5, 0.5): "Gray",
+        (1, 1, 1): "White",
+        (1, 0, 0): "Red",
+        (0, 0, 1): "Blue",
+        (0, 1, 0): "Green"
+    }
+    return rgb_to_color.get(tuple(rgb), "Gray")
\ No newline at end of file